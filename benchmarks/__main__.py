@@ -0,0 +1,96 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+from benchmarks import frames, harness, headless, startup
+from benchmarks.harness import Metric
+from utils.logging import Log
+
+SUITES = {"frames": frames.run, "headless": headless.run, "startup": startup.run}
+HERE = Path(__file__).resolve().parent
+# quick runs are noisier and measure less, they get their own baseline
+BASELINES = {False: HERE / "baseline.json", True: HERE / "baseline-quick.json"}
+
+
+def measure(suites: list[str], quick: bool, repeats: int) -> dict[str, list[Metric]]:
+    """Every suite's metrics, each the median of ``repeats`` runs."""
+    # the games log every point and win, which would only add noise to the timings
+    Log.set_level(logging.WARNING)
+    results = {name: harness.combine([SUITES[name](quick) for _ in range(repeats)]) for name in suites}
+    Log.set_level(logging.INFO)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks of the games' hot paths")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="run only this suite, can be repeated")
+    parser.add_argument("--quick", action="store_true", help="fewer frames and repeats, noisier numbers")
+    parser.add_argument("--repeats", type=int, default=3, help="runs of every suite, each metric is their median")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare against these results, defaults to the mode's own")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="fraction a metric may be worse than its baseline by, more for metrics noisier than that",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    baseline_path = args.baseline or BASELINES[args.quick]
+    settings = {"quick": args.quick, "repeats": args.repeats}
+    results = measure(args.suite or list(SUITES), args.quick, args.repeats)
+    metrics = [metric for suite in results.values() for metric in suite]
+
+    if args.output:
+        harness.save(args.output, metrics, settings)
+    missed = [m for m in metrics if m.misses_target()]
+    if missed:
+        Log.info("\n%s", harness.report(missed))
+        Log.error("%d metric(s) missed their target: %s", len(missed), ", ".join(m.name for m in missed))
+        sys.exit(1)
+    if args.update_baseline:
+        harness.save(baseline_path, metrics, settings)
+        Log.info("Saved the baseline to %s\n%s", baseline_path, harness.report(metrics))
+        return
+    if not baseline_path.exists():
+        Log.info("\n%s", harness.report(metrics))
+        return
+
+    baseline_settings, baseline = harness.load(baseline_path)
+    if baseline_settings != settings:
+        Log.error(
+            "%s was recorded with %s, not %s; run with the same options or --update-baseline",
+            baseline_path,
+            baseline_settings or "unknown settings",
+            settings,
+        )
+        sys.exit(2)
+
+    comparisons = harness.compare(metrics, baseline)
+    Log.info("\n%s", harness.report(metrics, comparisons, args.threshold))
+    suspects = {c.metric.name for c in comparisons if c.regressed(args.threshold)}
+    if not suspects:
+        return
+
+    # one bad measurement isn't a regression yet, it has to show up again in a fresh run of its suite
+    rerun = [name for name, suite in results.items() if any(m.name in suspects for m in suite)]
+    Log.info("Measuring %s again to confirm %d suspected regression(s)", ", ".join(rerun), len(suspects))
+    again = [metric for suite in measure(rerun, args.quick, args.repeats).values() for metric in suite]
+    confirmed = [
+        c for c in harness.compare(again, baseline) if c.metric.name in suspects and c.regressed(args.threshold)
+    ]
+    if not confirmed:
+        Log.info("None of them reproduced")
+        return
+    Log.info("\n%s", harness.report([c.metric for c in confirmed], confirmed, args.threshold))
+    Log.error(
+        "%d metric(s) regressed by more than their limit: %s",
+        len(confirmed),
+        ", ".join(c.metric.name for c in confirmed),
+    )
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
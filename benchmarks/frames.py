@@ -0,0 +1,102 @@
+from typing import Callable, Optional
+import numpy as np
+from benchmarks.harness import FixedClock, Metric, frame_metrics, latency_metrics, timed
+import pygame
+from pong.main import Pong
+from tic_tac_toe.main import TicTacToe
+
+WARMUP = 30
+# a single check_any_win is a fraction of a microsecond, about the resolution of the timer
+CHECK_REPEATS = 1000
+
+
+def key(k: int, unicode: str = "") -> pygame.event.Event:
+    return pygame.event.Event(pygame.KEYDOWN, key=k, unicode=unicode, mod=0, scancode=0)
+
+
+# a key nothing is bound to, wakes a sleeping loop up for one frame without changing anything
+NUDGE = key(pygame.K_F12)
+SERVE = key(pygame.K_SPACE, " ")
+
+
+def idle(game: Pong, frame: int):
+    pygame.event.post(NUDGE)
+
+
+def rally(game: Pong, frame: int):
+    if game.game_start_state:
+        pygame.event.post(SERVE)
+
+
+def paused_settings(game: Pong, frame: int):
+    if frame == 0:
+        pygame.event.post(SERVE)
+        pygame.event.post(key(pygame.K_p, "p"))
+        pygame.event.post(key(pygame.K_o, "o"))
+    pygame.event.post(NUDGE)
+
+
+def speed_fade(game: Pong, frame: int):
+    # a new indicator before the last one has faded, the loop never goes idle
+    if frame % 20 == 0:
+        pygame.event.post(key(pygame.K_PLUS, "+") if frame % 40 == 0 else key(pygame.K_MINUS, "-"))
+
+
+# name, script run before each frame, Pong keyword arguments
+PONG_SCENARIOS: list[tuple[str, Callable[[Pong, int], None], dict]] = [
+    ("idle", idle, {}),
+    ("rally", rally, {"cpu": "perfect"}),
+    ("paused_settings", paused_settings, {}),
+    ("speed_fade", speed_fade, {}),
+    ("chaos", rally, {"chaos": 1000}),
+]
+
+
+def pong_frames(name: str, script: Callable[[Pong, int], None], frames: int, **kwargs) -> list[Metric]:
+    """Times ``Pong.event_handler`` over ``frames`` frames with ``script`` posting the input."""
+    pygame.init()
+    times = []
+    with Pong(seed=0, **kwargs) as game:
+        game.clock = FixedClock()
+        game.input.poll_interval = 0
+        game.dt = 1 / 60
+        for frame in range(WARMUP + frames):
+            script(game, frame)
+            elapsed = timed(game.event_handler)
+            if frame >= WARMUP:
+                times.append(elapsed)
+    return frame_metrics(f"pong.{name}", times)
+
+
+def tic_tac_toe_moves(games: int, seed: Optional[int] = 0) -> list[Metric]:
+    """Latency of ``handle_click`` and of the ``check_any_win`` after each move, over random games
+    on the classic board."""
+    rng = np.random.default_rng(seed)
+    pygame.init()
+    clicks = []
+    checks = []
+
+    def check_repeatedly(game: TicTacToe):
+        for _ in range(CHECK_REPEATS):
+            game.check_any_win()
+
+    with TicTacToe() as game:
+        for _ in range(games):
+            game.reset()
+            for idx in rng.permutation(game.spec.n_cells):
+                if game._finished:
+                    break
+                pos = game.grid_idx_to_center(*game.spec.coords(int(idx)))
+                clicks.append(timed(lambda: game.handle_click(pos)))
+                checks.append(timed(lambda: check_repeatedly(game)) / CHECK_REPEATS)
+            game.dirty.present()
+    return latency_metrics("tic_tac_toe.handle_click", clicks) + latency_metrics("tic_tac_toe.check_any_win", checks)
+
+
+def run(quick: bool = False) -> list[Metric]:
+    frames = 120 if quick else 600
+    metrics = []
+    for name, script, kwargs in PONG_SCENARIOS:
+        metrics += pong_frames(name, script, frames, **kwargs)
+    metrics += tic_tac_toe_moves(20 if quick else 200)
+    return metrics
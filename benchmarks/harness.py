@@ -0,0 +1,176 @@
+import json
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Callable, Optional
+import numpy as np
+
+# benchmarks never open a window, set before pygame gets imported anywhere
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+HIGHER = "higher"
+LOWER = "lower"
+
+# a change has to exceed this many times a metric's spread between repeats to count as a regression
+NOISE_MARGIN = 2.0
+
+
+@dataclass
+class Metric:
+    name: str
+    value: float
+    unit: str
+    # which way is better, HIGHER for rates, LOWER for times
+    better: str
+    # how far the repeats ``value`` is the median of were apart, half their range as a fraction of it
+    spread: float = 0.0
+    # a value it has to reach whatever the baseline, for metrics that stand for a requirement
+    target: Optional[float] = None
+
+    def misses_target(self) -> bool:
+        if self.target is None:
+            return False
+        return self.value < self.target if self.better == HIGHER else self.value > self.target
+
+
+@dataclass
+class Comparison:
+    metric: Metric
+    baseline: float
+    # relative change, positive is an improvement whichever way ``better`` points
+    change: float
+    # the larger spread of the two measurements
+    noise: float = 0.0
+
+    def limit(self, threshold: float) -> float:
+        """How much worse the metric may get: ``threshold``, unless it's noisier than that."""
+        return max(threshold, NOISE_MARGIN * self.noise)
+
+    def regressed(self, threshold: float) -> bool:
+        """Worse than the baseline by more than ``limit(threshold)``, a fraction of the baseline value."""
+        return self.change < -self.limit(threshold)
+
+
+class FixedClock:
+    """Stands in for a game's ``pygame.time.Clock`` so frames come back to back.
+
+    Every tick reports a 60 fps frame, so the game logic advances as it would on screen
+    while the benchmark measures only the work done per frame.
+    """
+
+    def __init__(self, fps: float = 60):
+        self.frame_ms: int = round(1000 / fps)
+
+    def tick(self, framerate: float = 0) -> int:
+        return self.frame_ms
+
+    def get_fps(self) -> float:
+        return 1000 / self.frame_ms
+
+
+def frame_metrics(name: str, frame_times: list[float]) -> list[Metric]:
+    """Frames per second and the 95th percentile frame time of ``frame_times`` in seconds."""
+    times = np.asarray(frame_times)
+    return [
+        Metric(f"{name}.fps", float(len(times) / times.sum()), "fps", HIGHER),
+        Metric(f"{name}.p95", float(np.percentile(times, 95) * 1000), "ms", LOWER),
+    ]
+
+
+def latency_metrics(name: str, times: list[float], unit: str = "us") -> list[Metric]:
+    """Median and 95th percentile of ``times`` in seconds, reported in microseconds or milliseconds."""
+    scale = 1e6 if unit == "us" else 1e3
+    times = np.asarray(times) * scale
+    return [
+        Metric(f"{name}.p50", float(np.median(times)), unit, LOWER),
+        Metric(f"{name}.p95", float(np.percentile(times, 95)), unit, LOWER),
+    ]
+
+
+def combine(runs: list[list[Metric]]) -> list[Metric]:
+    """The median of every metric over repeated runs of a suite, with how far the runs were apart."""
+    by_name: dict[str, list[Metric]] = {}
+    for metrics in runs:
+        for metric in metrics:
+            by_name.setdefault(metric.name, []).append(metric)
+    combined = []
+    for samples in by_name.values():
+        values = np.array([m.value for m in samples])
+        median = float(np.median(values))
+        spread = float((values.max() - values.min()) / 2 / median) if median else 0.0
+        combined.append(replace(samples[0], value=median, spread=spread))
+    return combined
+
+
+def rate_metric(name: str, count: float, seconds: float, unit: str, target: Optional[float] = None) -> Metric:
+    return Metric(name, count / seconds, unit, HIGHER, target=target)
+
+
+def timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "system": platform.platform(),
+        "cpus": str(os.cpu_count()),
+    }
+
+
+def save(path: Path, metrics: list[Metric], settings: dict):
+    """Writes ``metrics`` with the ``settings`` they were measured with, only comparable to runs with the same."""
+    document = {
+        "environment": environment(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": settings,
+        "metrics": {m.name: asdict(m) for m in metrics},
+    }
+    Path(path).write_text(json.dumps(document, indent=2) + "\n")
+
+
+def load(path: Path) -> tuple[dict, dict[str, Metric]]:
+    """The settings and metrics ``save`` wrote, settings are empty for files that didn't record them."""
+    document = json.loads(Path(path).read_text())
+    metrics = {name: Metric(**fields) for name, fields in document["metrics"].items()}
+    return document.get("settings", {}), metrics
+
+
+def compare(metrics: list[Metric], baseline: dict[str, Metric]) -> list[Comparison]:
+    """Relative change of every metric that also has a baseline value."""
+    comparisons = []
+    for metric in metrics:
+        base = baseline.get(metric.name)
+        if base is None or base.value == 0:
+            continue
+        change = (metric.value - base.value) / base.value
+        if metric.better == LOWER:
+            change = -change
+        comparisons.append(Comparison(metric, base.value, change, max(metric.spread, base.spread)))
+    return comparisons
+
+
+def report(metrics: list[Metric], comparisons: Optional[list[Comparison]] = None, threshold: float = 0.0) -> str:
+    by_name = {c.metric.name: c for c in comparisons or []}
+    width = max(len(m.name) for m in metrics)
+    lines = []
+    for m in metrics:
+        line = f"{m.name:<{width}}  {m.value:>12,.2f} {m.unit:<10} ±{m.spread:>5.1%}"
+        if (c := by_name.get(m.name)) is not None:
+            flag = "  REGRESSION" if c.regressed(threshold) else ""
+            line += f"  baseline {c.baseline:>12,.2f}  {c.change:>+7.1%} (limit {c.limit(threshold):.0%}){flag}"
+        if m.target is not None:
+            line += f"  target {m.target:,.0f}{'  MISSED' if m.misses_target() else ''}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,93 @@
+import time
+from dataclasses import replace
+import numpy as np
+from benchmarks.harness import HIGHER, LOWER, Metric, rate_metric
+from pong.chaos import ChaosSimulation
+from pong.cpu import DIFFICULTIES, CpuController
+from pong.main import CHAOS_BALL_RADIUS
+from pong.simulation import FIXED_DT, LEFT, RIGHT, PongConfig, PongSimulation
+from tic_tac_toe.ai import MinimaxEngine, TranspositionTable
+from tic_tac_toe.board import BitBoard, BoardSpec, CLASSIC, Player
+from tic_tac_toe.env import TicTacToeEnv
+from tic_tac_toe.mcts import MctsEngine
+
+# the two fixed steps of every 60 FPS frame in at most half of it, the rest is for drawing the balls
+CHAOS_STEPS_TARGET = 2 * 60 * 2
+
+
+def pong_simulation(n_games: int, steps: int) -> list[Metric]:
+    """Game steps per second of the vectorized simulation, on its own and driven by two CPU paddles."""
+    sim = PongSimulation(n_games, auto_serve=True, seed=0)
+    actions = np.random.default_rng(0).integers(-1, 2, (steps, n_games, 2))
+    start = time.perf_counter()
+    for i in range(steps):
+        sim.step(FIXED_DT, actions[i])
+    raw = rate_metric("pong.simulation.step", n_games * steps, time.perf_counter() - start, "game-steps/s")
+
+    sim = PongSimulation(n_games, auto_serve=True, seed=0)
+    left = CpuController(sim, LEFT, DIFFICULTIES["hard"], seed=1)
+    right = CpuController(sim, RIGHT, DIFFICULTIES["hard"], seed=2)
+    both = np.zeros((n_games, 2))
+    start = time.perf_counter()
+    for _ in range(steps):
+        both[:, LEFT] = left.actions(FIXED_DT)
+        both[:, RIGHT] = right.actions(FIXED_DT)
+        sim.step(FIXED_DT, both)
+    cpu = rate_metric("pong.simulation.cpu_vs_cpu", n_games * steps, time.perf_counter() - start, "game-steps/s")
+    return [raw, cpu]
+
+
+def pong_chaos(n_balls: int, steps: int) -> list[Metric]:
+    """Physics steps per second of chaos mode as the game sets it up, which has to keep up with 60 FPS."""
+    chaos = ChaosSimulation(n_balls, replace(PongConfig(), ball_radius=CHAOS_BALL_RADIUS), seed=0)
+    actions = np.zeros((1, 2))
+    start = time.perf_counter()
+    for _ in range(steps):
+        chaos.step(FIXED_DT, actions)
+    elapsed = time.perf_counter() - start
+    return [rate_metric(f"pong.chaos.{n_balls}", steps, elapsed, "steps/s", target=CHAOS_STEPS_TARGET)]
+
+
+def tic_tac_toe_env(batch_size: int, steps: int) -> list[Metric]:
+    env = TicTacToeEnv(batch_size, seed=0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        env.step(env.sample_legal())
+    return [rate_metric("tic_tac_toe.env.step", batch_size * steps, time.perf_counter() - start, "moves/s")]
+
+
+def tic_tac_toe_engines(mcts_budget: float) -> list[Metric]:
+    """Filling a fresh minimax table for the classic board, the slowest first reply of a fresh engine
+    (as X, or as O after each opening) and MCTS playouts per second on a 7x7 board."""
+    start = time.perf_counter()
+    MinimaxEngine(CLASSIC, TranspositionTable(CLASSIC))
+    warm = Metric("tic_tac_toe.minimax.warm", (time.perf_counter() - start) * 1000, "ms", LOWER)
+    replies = []
+    for opening in [None, *range(CLASSIC.n_cells)]:
+        engine = MinimaxEngine(CLASSIC, TranspositionTable(CLASSIC))
+        board = BitBoard(CLASSIC)
+        player = Player.X
+        if opening is not None:
+            board.play(opening, Player.X)
+            player = Player.O
+        start = time.perf_counter()
+        engine.choose_move(board, player)
+        replies.append(time.perf_counter() - start)
+    reply = Metric("tic_tac_toe.minimax.first_reply", max(replies) * 1e6, "us", LOWER)
+
+    spec = BoardSpec(7, 7, 5)
+    engine = MctsEngine(spec, time_budget=mcts_budget, workers=1, seed=0)
+    engine.choose_move(BitBoard(spec), Player.X)
+    playouts = Metric("tic_tac_toe.mcts.playouts", engine.last_stats.playouts_per_second, "playouts/s", HIGHER)
+    return [warm, reply, playouts]
+
+
+def run(quick: bool = False) -> list[Metric]:
+    scale = 1 if quick else 5
+    return (
+        pong_simulation(1024, 200 * scale)
+        + pong_chaos(1000, 50 * scale)
+        + pong_chaos(2000, 50 * scale)
+        + tic_tac_toe_env(4096, 200 * scale)
+        + tic_tac_toe_engines(0.2 if quick else 1.0)
+    )
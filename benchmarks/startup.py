@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from benchmarks.harness import LOWER, Metric
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# each script starts a game in a fresh interpreter and reports as soon as its first frame is out
+FIRST_FRAME = {
+    "pong": """
+import pygame
+from pong.main import Pong
+pygame.init()
+with Pong(seed=0) as game:
+    pygame.event.post(pygame.event.Event(pygame.WINDOWEXPOSED))
+    game.event_handler()
+    print("ready", flush=True)
+""",
+    "tic_tac_toe": """
+import pygame
+from tic_tac_toe.main import TicTacToe
+with TicTacToe() as game:
+    pygame.event.post(pygame.event.Event(pygame.WINDOWEXPOSED))
+    game.main()
+    print("ready", flush=True)
+""",
+}
+
+
+def time_to_first_frame(game: str) -> float:
+    """Seconds from launching the interpreter to the game's first presented frame."""
+    start = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, "-c", FIRST_FRAME[game]], cwd=ROOT, env=os.environ.copy(), stdout=subprocess.PIPE, text=True
+    )
+    line = child.stdout.readline()
+    elapsed = time.perf_counter() - start
+    child.wait()
+    if line.strip() != "ready":
+        raise RuntimeError(f"{game} exited with {child.returncode} before its first frame")
+    return elapsed
+
+
+def run(quick: bool = False) -> list[Metric]:
+    repeats = 3 if quick else 7
+    metrics = []
+    for game in FIRST_FRAME:
+        times = [time_to_first_frame(game) for _ in range(repeats)]
+        metrics.append(Metric(f"{game}.cold_start", float(np.median(times)) * 1000, "ms", LOWER))
+    return metrics
@@ -0,0 +1,53 @@
+import argparse
+import importlib
+import os
+import sys
+from utils.startup import ImportTimer, Startup
+
+# module with the game's main() and the font sizes it uses
+GAMES: dict[str, tuple[str, tuple[int, ...]]] = {
+    "pong": ("pong.main", (20, 24, 36, 48)),
+    "tic_tac_toe": ("tic_tac_toe.main", (20, 36)),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Starts a game, loading as little as possible before its first frame",
+        epilog="anything after the game's name is passed on to it, e.g. launcher pong --cpu hard",
+    )
+    parser.add_argument("--import-report", action="store_true", help="log the slowest imports after the first frame")
+    parser.add_argument("game", choices=GAMES)
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments for the game")
+    args = parser.parse_args()
+
+    if args.import_report:
+        Startup.imports = ImportTimer().install()
+
+    # pygame.pkgdata only uses pkg_resources when it can import it and falls back to plain file
+    # access otherwise; pkg_resources alone takes longer to import than the rest of pygame. It's
+    # hidden for pygame's own import only, importing it later in the game works as usual
+    hidden = "pkg_resources" not in sys.modules
+    if hidden:
+        sys.modules["pkg_resources"] = None
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    try:
+        import pygame
+    finally:
+        if hidden:
+            del sys.modules["pkg_resources"]
+
+    Startup.mark("pygame imported")
+    Startup.watch_first_frame()
+    module_name, font_sizes = GAMES[args.game]
+    pygame.font.init()
+    Startup.preload_fonts(font_sizes)
+    game = importlib.import_module(module_name)
+    Startup.mark("game imported")
+
+    sys.argv = [module_name, *args.args]
+    game.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+from typing import Optional
+import numpy as np
+from pong.simulation import PongConfig, PongSimulation
+
+# grid neighbours that still need checking once a cell has been compared with itself;
+# the other four are covered when the neighbour's own turn comes
+HALF_NEIGHBOURHOOD: tuple[tuple[int, int], ...] = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+# squared distance pre-check margin, wide enough that rounding can't drop a pair the exact test keeps
+NEAR_SLACK = 1.001
+
+
+class SpatialHash:
+    """Uniform grid over the field for finding balls that may touch, without comparing every pair.
+
+    With cells one ball diameter wide, two balls can only overlap if their cells are the
+    same or adjacent. Balls are bucketed by sorting on cell index, then each cell is
+    paired with itself and half of its neighbours, all neighbours in one go as array
+    operations. The arrays that only depend on the grid and the ball count are kept
+    between calls.
+    """
+
+    def __init__(self, width: float, height: float, cell_size: float):
+        self.cell_size: float = cell_size
+        self.cols: int = int(np.ceil(width / cell_size))
+        self.rows: int = int(np.ceil(height / cell_size))
+        n_cells = self.rows * self.cols
+        # neighbours[k, c] is cell c's neighbour k, or the always empty cell ``n_cells`` past the edge
+        cx, cy = np.meshgrid(np.arange(self.cols), np.arange(self.rows))
+        self.neighbours = np.full((len(HALF_NEIGHBOURHOOD), n_cells), n_cells, dtype=np.intp)
+        for k, (dx, dy) in enumerate(HALF_NEIGHBOURHOOD):
+            nx, ny = cx.ravel() + dx, cy.ravel() + dy
+            inside = (nx >= 0) & (nx < self.cols) & (ny < self.rows)
+            self.neighbours[k, inside] = ny[inside] * self.cols + nx[inside]
+        self._n_balls: int = -1
+
+    def _resize(self, n_balls: int):
+        self._n_balls = n_balls
+        self._balls = np.arange(n_balls)
+        self._owners = np.tile(self._balls, len(HALF_NEIGHBOURHOOD))
+        self._cell = np.empty(n_balls, dtype=np.intp)
+        self._cy = np.empty(n_balls, dtype=np.intp)
+        self._rank = np.empty(n_balls, dtype=np.intp)
+
+    def candidate_pairs(self, pos: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Index pairs (i, j) of balls in the same or neighbouring cells, each pair once.
+
+        Pairs come grouped by neighbour, then by ``i``; balls sharing a cell only pair
+        with the ones after them, which the stable sort puts in index order.
+        """
+        n = len(pos)
+        if n != self._n_balls:
+            self._resize(n)
+        cell, cy = self._cell, self._cy
+        np.floor_divide(pos[:, 0], self.cell_size, out=cell, casting="unsafe")
+        np.clip(cell, 0, self.cols - 1, out=cell)
+        np.floor_divide(pos[:, 1], self.cell_size, out=cy, casting="unsafe")
+        np.clip(cy, 0, self.rows - 1, out=cy)
+        cell += cy * self.cols
+
+        order = np.argsort(cell, kind="stable")
+        self._rank[order] = self._balls
+        counts = np.bincount(cell, minlength=self.rows * self.cols + 1)
+        starts = np.cumsum(counts) - counts
+
+        neighbours = self.neighbours[:, cell]
+        first = starts[neighbours]
+        n_pairs = counts[neighbours]
+        # within its own cell a ball only pairs with the balls sorted after it
+        first[0] = self._rank + 1
+        n_pairs[0] -= first[0] - starts[cell]
+        first, n_pairs = first.ravel(), n_pairs.ravel()
+
+        i = np.repeat(self._owners, n_pairs)
+        # the sorted position of each pair's j, its run start plus how far into the run it is
+        skip = np.cumsum(n_pairs) - n_pairs - first
+        j = order[np.arange(len(i)) - np.repeat(skip, n_pairs)]
+        return i, j
+
+
+class ChaosSimulation:
+    """Hundreds to thousands of balls on one field with a single pair of paddles.
+
+    The balls are the "games" of a ``PongSimulation`` that all share the same paddle
+    positions, so walls, paddles and scoring come from its swept, vectorized physics.
+    On top of that, balls bounce off each other: a ``SpatialHash`` finds nearby pairs
+    and overlapping, approaching ones exchange the velocity along their normal (an
+    elastic collision between equal masses). A ball that scores comes back at a
+    random height, served towards the side that scored.
+    """
+
+    def __init__(self, n_balls: int, config: Optional[PongConfig] = None, speed: float = 450, seed=None):
+        config = config if config is not None else PongConfig()
+        self.config: PongConfig = config
+        self.n_balls: int = n_balls
+        self.rng = np.random.default_rng(seed)
+        self.balls = PongSimulation(n_balls, config, speed, auto_serve=True, seed=self.rng.integers(2**63))
+        self.paddle_x: np.ndarray = self.balls.paddle_x
+        # shaped like a single game's, so the drawing code can treat this as one
+        self.paddle_y: np.ndarray = self.balls.paddle_y[:1].copy()
+        self.speed: np.ndarray = self.balls.speed[:1]
+        self.scores: np.ndarray = np.zeros(2, dtype=np.int64)
+        self.grid = SpatialHash(config.width, config.height, 2 * config.ball_radius)
+        # scratch space for ``collide``, one entry per ball
+        self._involved = np.zeros(n_balls, dtype=bool)
+        self._first_mention = np.empty(n_balls, dtype=np.intp)
+
+        # spread the balls over the middle third instead of stacking them on the centre spot
+        r = config.ball_radius
+        self.balls.ball_pos[:, 0] = self.rng.uniform(config.width / 3, 2 * config.width / 3, n_balls)
+        self.balls.ball_pos[:, 1] = self.rng.uniform(r, config.height - r, n_balls)
+        self.balls.latest_winner[:] = self.rng.integers(0, 2, n_balls)
+        self.balls.serve()
+
+    def set_speed(self, speed: float):
+        self.balls.set_speed(speed)
+
+    def step(self, dt: float, actions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Moves paddles and balls by ``dt``, returns the points (left, right) scored during it.
+
+        ``actions`` is the (1, 2) array of paddle directions a single game takes.
+        """
+        cfg = self.config
+        if actions is not None:
+            movement = np.asarray(actions, dtype=np.float64) * self.speed[0] * dt
+            np.clip(self.paddle_y + movement, 0, cfg.height - cfg.paddle_height, out=self.paddle_y)
+        self.balls.paddle_y[:] = self.paddle_y
+
+        before = self.balls.scores.sum(axis=0)
+        scored = self.balls.step(dt)
+        points = self.balls.scores.sum(axis=0) - before
+        self.scores += points
+        if scored.any():
+            r = cfg.ball_radius
+            self.balls.ball_pos[scored, 1] = self.rng.uniform(r, cfg.height - r, np.count_nonzero(scored))
+
+        self.collide()
+        return points
+
+    def collide(self, passes: int = 3):
+        """Bounces touching balls off each other.
+
+        Impulses computed from the same velocities don't add up when a ball is in several
+        collisions at once, so each pass only resolves pairs whose balls are in no other
+        pair of that pass. Anything left over gets another pass, or the next step.
+        """
+        pos = self.balls.ball_pos
+        x, y = pos[:, 0], pos[:, 1]
+        vx, vy = self.balls.ball_vel[:, 0], self.balls.ball_vel[:, 1]
+        diameter = 2 * self.config.ball_radius
+        i, j = self.grid.candidate_pairs(pos)
+        dx, dy = x[j] - x[i], y[j] - y[i]
+        # most candidates are nowhere near touching, squared distances get rid of them cheaply
+        # and leave the exact test to the few that are left
+        near = np.flatnonzero(dx * dx + dy * dy < diameter * diameter * NEAR_SLACK)
+        i, j, dx, dy = i[near], j[near], dx[near], dy[near]
+        dist = np.hypot(dx, dy)
+        touching = np.flatnonzero((dist < diameter) & (dist > 0))
+        if not len(touching):
+            return
+        i, j, dist = i[touching], j[touching], dist[touching]
+        # the components are kept apart, indexing 1D arrays is much cheaper than (n, 2) ones
+        nx, ny = dx[touching] / dist, dy[touching] / dist
+
+        # push overlapping balls apart so they don't stay stuck together
+        half_overlap = (diameter - dist) / 2
+        px, py = nx * half_overlap, ny * half_overlap
+        np.add.at(x, i, -px)
+        np.add.at(y, i, -py)
+        np.add.at(x, j, px)
+        np.add.at(y, j, py)
+        r = self.config.ball_radius
+        np.clip(y, r, self.config.height - r, out=y)
+
+        # arcade rather than billiards: bounces turn balls but keep their speed, otherwise
+        # slow balls pile up in the middle while the fast ones score and get re-served
+        involved = self._involved
+        involved[:] = False
+        involved[i] = True
+        involved[j] = True
+        speed = np.hypot(vx[involved], vy[involved])
+        for _ in range(passes):
+            closing = (vx[j] - vx[i]) * nx + (vy[j] - vy[i]) * ny
+            approaching = np.flatnonzero(closing < 0)
+            if not len(approaching):
+                break
+            i, j, nx, ny, closing = (
+                i[approaching],
+                j[approaching],
+                nx[approaching],
+                ny[approaching],
+                closing[approaching],
+            )
+            # a pair goes ahead if it is the first to mention both of its balls
+            ends = np.stack((i, j), axis=1).ravel()
+            mentions = np.arange(len(ends))
+            first = self._first_mention
+            first[ends] = len(ends)
+            np.minimum.at(first, ends, mentions)
+            mentioned_first = first[ends] == mentions
+            independent = np.flatnonzero(mentioned_first[0::2] & mentioned_first[1::2])
+            a, b, c = i[independent], j[independent], closing[independent]
+            impulse_x, impulse_y = nx[independent] * c, ny[independent] * c
+            vx[a] += impulse_x
+            vy[a] += impulse_y
+            vx[b] -= impulse_x
+            vy[b] -= impulse_y
+        new_speed = np.hypot(vx[involved], vy[involved])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(new_speed > 0, speed / new_speed, 1)
+        vx[involved] *= scale
+        vy[involved] *= scale
@@ -0,0 +1,164 @@
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from utils.logging import Log
+from pong.simulation import FIXED_DT, LEFT, RIGHT, PongConfig, PongSimulation
+
+
+@dataclass(frozen=True)
+class Difficulty:
+    # seconds between the ball changing direction and the paddle reacting to it
+    reaction_delay: float
+    # standard deviation of the aim, in pixels from the predicted intercept
+    error: float
+
+
+DIFFICULTIES: dict[str, Difficulty] = {
+    "easy": Difficulty(reaction_delay=0.3, error=70),
+    "normal": Difficulty(reaction_delay=0.2, error=45),
+    "hard": Difficulty(reaction_delay=0.1, error=30),
+    "perfect": Difficulty(reaction_delay=0.0, error=0),
+}
+
+
+def predict_intercept(y: np.ndarray, vy: np.ndarray, t: np.ndarray, config: PongConfig) -> np.ndarray:
+    """Where balls at height ``y`` moving at ``vy`` will be after ``t`` seconds.
+
+    Bounces off the top and bottom walls are folded in analytically: the ball centre
+    travels back and forth over a span of ``height - 2 * radius``, so its unfolded
+    position is reduced modulo twice the span and mirrored on the way back.
+    """
+    r = config.ball_radius
+    span = config.height - 2 * r
+    travelled = np.mod(y - r + vy * t, 2 * span)
+    return r + np.where(travelled > span, 2 * span - travelled, travelled)
+
+
+class CpuController:
+    """Moves one side's paddle in every game of a simulation towards the predicted intercept.
+
+    The intercept only changes when a ball's velocity does (a serve or a bounce), so it
+    is recomputed for those games alone and the per frame work is a few array
+    comparisons. A new target takes ``reaction_delay`` seconds to kick in and is off
+    by a normally distributed ``error``; balls moving away send the paddle back to the
+    middle.
+    """
+
+    def __init__(
+        self, sim: PongSimulation, side: int = RIGHT, difficulty: Difficulty = DIFFICULTIES["normal"], seed=None
+    ):
+        self.sim: PongSimulation = sim
+        self.side: int = side
+        self.difficulty: Difficulty = difficulty
+        self.rng = np.random.default_rng(seed)
+        cfg = sim.config
+        middle = cfg.height / 2
+        self.target = np.full(sim.n_games, middle)
+        self.pending = np.full(sim.n_games, middle)
+        self.react_at = np.zeros(sim.n_games)
+        self.last_vel = np.zeros((sim.n_games, 2))
+        self.clock: float = 0.0
+        # x of the ball centre when it touches this paddle's inner face
+        r = cfg.ball_radius
+        self.face_x: float = sim.paddle_x[side] + cfg.paddle_width + r if side == LEFT else sim.paddle_x[side] - r
+
+    def _retarget(self, changed: np.ndarray):
+        cfg = self.sim.config
+        x, y = self.sim.ball_pos[changed].T
+        vx, vy = self.sim.ball_vel[changed].T
+        incoming = vx < 0 if self.side == LEFT else vx > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(incoming, (self.face_x - x) / vx, 0)
+        aim = predict_intercept(y, vy, t, cfg) + self.rng.normal(0, self.difficulty.error, len(t))
+        self.pending[changed] = np.where(incoming, aim, cfg.height / 2)
+        self.react_at[changed] = self.clock + self.difficulty.reaction_delay
+
+    def _advance(self, dt: float):
+        self.clock += dt
+        changed = (self.sim.ball_vel != self.last_vel).any(axis=1)
+        if changed.any():
+            self._retarget(changed)
+            self.last_vel[changed] = self.sim.ball_vel[changed]
+        np.copyto(self.target, self.pending, where=self.clock >= self.react_at)
+
+    def actions(self, dt: float) -> np.ndarray:
+        """The -1/0/1 paddle direction for every game, for the next ``dt`` seconds."""
+        self._advance(dt)
+        centre = self.sim.paddle_y[:, self.side] + self.sim.config.paddle_height / 2
+        offset = self.target - centre
+        # close enough when the next move would overshoot, otherwise the paddle jitters
+        dead_zone = self.sim.speed * dt / 2
+        return np.where(offset > dead_zone, 1, np.where(offset < -dead_zone, -1, 0))
+
+    def swarm_action(self, dt: float) -> int:
+        """One direction for a paddle every game shares, like chaos mode's swarm of balls.
+
+        The paddle goes for the target of the incoming ball that reaches it first, and back
+        to the middle when none is coming.
+        """
+        self._advance(dt)
+        cfg = self.sim.config
+        x, vx = self.sim.ball_pos[:, 0], self.sim.ball_vel[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (self.face_x - x) / vx
+        # balls already past the paddle's face can't be reached any more
+        t[~((vx < 0 if self.side == LEFT else vx > 0) & (t >= 0))] = np.inf
+        first = int(np.argmin(t))
+        target = self.target[first] if np.isfinite(t[first]) else cfg.height / 2
+
+        offset = target - (self.sim.paddle_y[0, self.side] + cfg.paddle_height / 2)
+        dead_zone = self.sim.speed[0] * dt / 2
+        return 1 if offset > dead_zone else -1 if offset < -dead_zone else 0
+
+
+def evaluate(
+    difficulty: Difficulty, opponent: Difficulty, n_games: int, seconds: float, seed: Optional[int] = None
+) -> dict[str, float]:
+    """Plays ``difficulty`` on the left against ``opponent`` in ``n_games`` headless games."""
+    seeds = np.random.SeedSequence(seed).spawn(3)
+    sim = PongSimulation(n_games, auto_serve=True, seed=seeds[0])
+    left = CpuController(sim, LEFT, difficulty, seeds[1])
+    right = CpuController(sim, RIGHT, opponent, seeds[2])
+    actions = np.zeros((n_games, 2))
+    hits = 0
+    steps = int(seconds / FIXED_DT)
+    for _ in range(steps):
+        actions[:, LEFT] = left.actions(FIXED_DT)
+        actions[:, RIGHT] = right.actions(FIXED_DT)
+        vx = np.sign(sim.ball_vel[:, 0])
+        scored = sim.step(FIXED_DT, actions)
+        hits += np.count_nonzero(~scored & (np.sign(sim.ball_vel[:, 0]) == -vx) & (vx != 0))
+    points = sim.scores.sum()
+    return {
+        "win_rate": float(sim.scores[:, LEFT].sum() / points) if points else 0.5,
+        "rally": float(hits / points) if points else float("inf"),
+        "points_per_minute": float(points / n_games / seconds * 60),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune CPU difficulties against each other in headless games")
+    parser.add_argument("--opponent", choices=DIFFICULTIES, default="perfect")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=60, help="simulated time per game")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    for name, difficulty in DIFFICULTIES.items():
+        start = time.perf_counter()
+        stats = evaluate(difficulty, DIFFICULTIES[args.opponent], args.games, args.seconds, args.seed)
+        Log.info(
+            "%-8s vs %s: wins %.1f%%, %.1f hits per point, %.1f points/min (%.1fs)",
+            name,
+            args.opponent,
+            stats["win_rate"] * 100,
+            stats["rally"],
+            stats["points_per_minute"],
+            time.perf_counter() - start,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+import pygame
+from utils.profiling import RingBuffer
+from pong.recording import KEYS, Edge, actions_from_bits
+from pong.simulation import FIXED_DT, MAX_FRAME_TIME
+
+KEY_EVENTS = (pygame.KEYDOWN, pygame.KEYUP)
+KEY_INDEX: dict[int, int] = {key: i for i, key in enumerate(KEYS)}
+
+
+@dataclass
+class FrameInput:
+    """The paddle keys over one frame's physics steps: ``bits`` held at the start, then the
+    ``edges`` with their offsets in seconds from the start of the first step, in order."""
+
+    bits: int
+    edges: list[Edge] = field(default_factory=list)
+    # every step of a frame without edges takes the same actions
+    _still: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+
+    def actions(self, step: int) -> np.ndarray:
+        """The actions for fixed step ``step`` of the frame, each key weighted by the fraction of the step it was held.
+
+        A key pressed half way through a step moves its paddle half a step's distance, so
+        the paddle ends up where holding the key from the moment it went down would put it,
+        whatever the frame rate.
+        """
+        if not self.edges:
+            if self._still is None:
+                self._still = actions_from_bits(self.bits)
+            return self._still
+        start = step * FIXED_DT
+        end = start + FIXED_DT
+        bits = self.bits
+        held = [0.0] * len(KEYS)
+        since = [start] * len(KEYS)
+        changed = 0
+        for offset, i, pressed in self.edges:
+            if offset >= end:
+                break
+            if offset > start:
+                if bits >> i & 1:
+                    held[i] += offset - since[i]
+                since[i] = offset
+                changed |= 1 << i
+            bits = bits | 1 << i if pressed else bits & ~(1 << i)
+        for i in range(len(KEYS)):
+            if not changed >> i & 1:
+                # exactly 1 or 0, a key that didn't change during the step moves like it always did
+                held[i] = float(bits >> i & 1)
+            else:
+                held[i] = (held[i] + (end - since[i] if bits >> i & 1 else 0.0)) / FIXED_DT
+        return np.array([[held[1] - held[0], held[3] - held[2]]])
+
+
+class InputTimeline:
+    """Timestamps the paddle keys' presses and releases and cuts them into ``FrameInput``s.
+
+    ``collect`` takes key events off the queue as they come in and the frame limiter
+    (``tick``) calls it while it waits, so an edge's time is good to about
+    ``poll_interval`` rather than a frame. That only happens while the physics runs;
+    every poll is a wake up, at the default 4 ms under 1% of a core over a plain
+    ``clock.tick``. The events still reach the game through ``events`` at the start
+    of the next frame. ``take`` hands the physics the edges up to the end of the
+    steps it's about to run, the rest wait for the next frame. The time from each
+    edge to the ``presented`` frame that first showed it goes into ``latency``.
+    """
+
+    def __init__(self, poll_interval: float = 0.004, capacity: int = 600):
+        # 0 leaves the frame limiter to ``clock.tick`` alone, like benchmarks and ``--input-poll 0``
+        self.poll_interval: float = poll_interval
+        self.bits: int = 0  # keys held at ``cursor``
+        # how far the physics has used the input, None while it isn't running
+        self.cursor: Optional[float] = None
+        self.latency = RingBuffer(capacity)
+        self._held: int = 0  # keys held after the last edge
+        self._edges: deque[Edge] = deque()
+        self._pending: list[pygame.event.Event] = []
+        self._unseen: list[float] = []
+        self._ticked: Optional[float] = None
+
+    @property
+    def pending(self) -> bool:
+        """Whether ``collect`` took events the game hasn't seen yet, the loop mustn't sleep on them."""
+        return bool(self._pending)
+
+    def _add(self, t: float, i: int, pressed: bool):
+        self._edges.append((t, i, pressed))
+        self._held = self._held | 1 << i if pressed else self._held & ~(1 << i)
+
+    def _stamp(self, events: list[pygame.event.Event]):
+        now = time.perf_counter()
+        for event in events:
+            if event.type in KEY_EVENTS and event.key in KEY_INDEX:
+                self._add(now, KEY_INDEX[event.key], event.type == pygame.KEYDOWN)
+
+    def collect(self):
+        events = pygame.event.get(KEY_EVENTS)
+        if events:
+            self._stamp(events)
+            self._pending += events
+
+    def events(self, new: list[pygame.event.Event]) -> list[pygame.event.Event]:
+        """The events ``collect`` took since the last frame followed by ``new``, which get stamped now."""
+        self._stamp(new)
+        if not self._pending:
+            return new
+        events, self._pending = self._pending + new, []
+        return events
+
+    def sync(self, bits: int):
+        """Adds the edges no event reported, from ``key_bits`` of ``pygame.key.get_pressed()``.
+
+        That covers keys already down when the window opened and keys let go while it
+        didn't have the focus.
+        """
+        changed = bits ^ self._held
+        if changed:
+            now = time.perf_counter()
+            for i in range(len(KEYS)):
+                if changed >> i & 1:
+                    self._add(now, i, bool(bits >> i & 1))
+
+    def take(self, steps: int) -> FrameInput:
+        """The input for the ``steps`` fixed steps the physics runs this frame, ending about now."""
+        now = time.perf_counter()
+        duration = steps * FIXED_DT
+        if self.cursor is None or self.cursor + duration < now - MAX_FRAME_TIME:
+            # starting to play, or the physics dropped time after a hitch and would only fall further behind
+            self.cursor = now - duration
+        frame = FrameInput(self.bits)
+        end = self.cursor + duration
+        while self._edges and self._edges[0][0] < end:
+            t, i, pressed = self._edges.popleft()
+            frame.edges.append((max(t - self.cursor, 0.0), i, pressed))
+            self.bits = self.bits | 1 << i if pressed else self.bits & ~(1 << i)
+            self._unseen.append(t)
+        self.cursor = end
+        return frame
+
+    def idle(self):
+        """The physics isn't running: the edges so far only change which keys are held."""
+        self._edges.clear()
+        self._unseen.clear()
+        self.bits = self._held
+        self.cursor = None
+
+    def presented(self):
+        """Call right after the frame is on screen, to time the edges its physics used."""
+        if self._unseen:
+            now = time.perf_counter()
+            for t in self._unseen:
+                self.latency.append(now - t)
+            self._unseen.clear()
+
+    def tick(self, clock: pygame.time.Clock, framerate: int) -> int:
+        """``clock.tick(framerate)``, collecting key events while it would sleep, if the physics is running."""
+        if self.poll_interval > 0 and self.cursor is not None and self._ticked is not None:
+            deadline = self._ticked + 1 / framerate - self.poll_interval
+            while time.perf_counter() < deadline:
+                self.collect()
+                time.sleep(self.poll_interval)
+        ms = clock.tick(framerate)
+        self._ticked = time.perf_counter()
+        return ms
+
+    def latency_summary(self) -> dict[str, float]:
+        """Median, 95th percentile and worst input to display latency, in milliseconds."""
+        values = self.latency.values()
+        if not len(values):
+            return {}
+        p50, p95 = np.percentile(values, [50, 95])
+        return {"p50_ms": float(p50 * 1000), "p95_ms": float(p95 * 1000), "max_ms": float(values.max() * 1000)}
+
+
+class RecordedInput:
+    """Stands in for ``InputTimeline`` in a replay, the physics gets the recorded ``frame``."""
+
+    def __init__(self):
+        self.frame = FrameInput(0)
+
+    def take(self, steps: int) -> FrameInput:
+        return self.frame
+
+    def idle(self):
+        pass
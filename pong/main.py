@@ -1,10 +1,33 @@
+import argparse
+import time
 import pygame
 import numpy as np
+from dataclasses import replace
 from enum import Enum
 from utils.logging import Log
-from dataclasses import dataclass
-from typing import Optional
-from utils.display import FadingText, create_fading_text
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+from utils.animation import Animator, Tween
+from utils.display import DirtyRects, text_cache
+from utils.loop import Scheduler
+from utils.profiling import FrameProfiler
+from utils.sprites import Blend, Shape, SpriteAtlas
+from pong.chaos import ChaosSimulation
+from pong.cpu import DIFFICULTIES, CpuController
+from pong.input import FrameInput, InputTimeline
+from pong.recording import KEYS, STEPPED, InputRecorder, key_bits
+from pong.simulation import FIXED_DT, LEFT, MAX_FRAME_TIME, MIN_SPEED, RIGHT, PongConfig, PongSimulation
+
+if TYPE_CHECKING:
+    # netplay pulls in asyncio, which is only worth loading for a network game
+    from pong.netplay import RollbackSession
+
+# chaos mode packs in a lot of balls, they have to be smaller to fit
+CHAOS_BALL_RADIUS = 4
+CHAOS_BALLS = 1000
+
+# profiling and debugging keys, left out of recordings
+DEBUG_KEYS = (pygame.K_F3, pygame.K_F4, pygame.K_F5)
 
 
 class Orientation(Enum):
@@ -12,69 +35,67 @@ class Orientation(Enum):
     RIGHT = 2
 
 
-@dataclass
-class Velocity:
-    x: float
-    y: float
-
-
 class Paddle:
-    def __init__(self, orientation: Orientation, screen_width: int, screen_height: int, screen: pygame.Surface):
-        self.width: int = 10
-        self.height: int = 100
+    def __init__(self, orientation: Orientation, sim: PongSimulation, screen: pygame.Surface, sprites: SpriteAtlas):
+        self.width: int = sim.config.paddle_width
+        self.height: int = sim.config.paddle_height
         self.screen: pygame.Surface = screen
-        self.screen_height: int = screen_height
+        self.sprites: SpriteAtlas = sprites
+        self.sim: PongSimulation = sim
 
         self.orientation: Orientation = orientation
         if orientation == Orientation.LEFT:
-            self.x = 0
+            self.side = LEFT
             self.CONTROL_UP = pygame.K_w
             self.CONTROL_DOWN = pygame.K_s
         else:
-            self.x = screen_width - self.width
+            self.side = RIGHT
             self.CONTROL_UP = pygame.K_UP
             self.CONTROL_DOWN = pygame.K_DOWN
 
-        self.rect = pygame.Rect(self.x, screen_height / 2 - self.height / 2, self.width, self.height)
+        self.x = sim.paddle_x[self.side]
 
     def draw(self):
-        self.render = pygame.draw.rect(self.screen, "black", self.rect)
+        return self.sprites.blit(self.screen, "paddle", (self.x, self.sim.paddle_y[0, self.side]))
 
-    def move(self, movement: int):
-        new_y = self.rect.y + movement
-        # paddles can't move out of the screen
-        new_y = max(0, min(new_y, self.screen_height - self.height))
-
-        self.rect.y = new_y
+    def direction(self, keys) -> int:
+        return keys[self.CONTROL_DOWN] - keys[self.CONTROL_UP]
 
 
 class Ball:
-    def __init__(self, screen_width: int, screen_height: int, screen: pygame.Surface):
-        self.x: int = screen_width / 2
-        self.y: int = screen_height / 2
+    def __init__(self, sim: PongSimulation, screen: pygame.Surface, sprites: SpriteAtlas):
         self.screen: pygame.Surface = screen
-        self.radius: int = 10
-        self.velocity: Velocity = Velocity(x=0, y=0)
-        self.hit_box: pygame.Rect = pygame.Rect(self.x, self.y, 2 * self.radius, 2 * self.radius)
+        self.sprites: SpriteAtlas = sprites
+        self.sim: PongSimulation = sim
+        self.radius: int = sim.config.ball_radius
+
+    @property
+    def x(self) -> float:
+        return self.sim.ball_pos[0, 0]
+
+    @property
+    def y(self) -> float:
+        return self.sim.ball_pos[0, 1]
 
     def draw(self):
-        self.circle = pygame.draw.circle(self.screen, "red", (self.x, self.y), self.radius)
+        return self.sprites.blit_centered(self.screen, "ball", (self.x, self.y))
 
-    def start(self, speed: float, direction: Orientation):
-        self.velocity.x = speed if direction == Orientation.RIGHT else -speed
-        self.velocity.y = speed * np.random.uniform(-0.5, 0.5)
+    def start(self):
+        self.sim.serve()
 
-    def move(self, dt: float):
-        self.x += self.velocity.x * dt
-        self.y += self.velocity.y * dt
-        self.hit_box.centerx = self.x
-        self.hit_box.centery = self.y
 
-    def bounce_x(self):
-        self.velocity.x = -self.velocity.x
+class BallSwarm:
+    """Draws every ball of a ``ChaosSimulation`` in one ``blits`` call of a pre-rendered sprite."""
 
-    def bounce_y(self):
-        self.velocity.y = -self.velocity.y
+    def __init__(self, chaos: ChaosSimulation, screen: pygame.Surface, sprites: SpriteAtlas):
+        self.screen: pygame.Surface = screen
+        self.sprites: SpriteAtlas = sprites
+        self.chaos: ChaosSimulation = chaos
+        self.radius: int = chaos.config.ball_radius
+
+    def draw(self):
+        topleft = (self.chaos.balls.ball_pos - self.radius).astype(np.int32).tolist()
+        self.sprites.blits(self.screen, "swarm_ball", topleft)
 
 
 class Score:
@@ -83,34 +104,57 @@ class Score:
         self.font_size: int = 36
         self.x: int = screen_width / 2
         self.y: int = self.font_size
-        self.font = pygame.font.Font(pygame.font.get_default_font(), self.font_size)
+        self.font = text_cache.font(self.font_size)
         self.left_score: int = 0
         self.right_score: int = 0
+        self.text: Optional[pygame.Surface] = None
 
     def draw(self):
-        self.text = self.font.render(f"{self.left_score} - {self.right_score}", True, "black")
-        text_rect = self.text.get_rect()
-        text_rect.center = (self.x, self.y)
-        self.screen.blit(self.text, text_rect)
+        if self.text is None:
+            self.text = text_cache.render(self.label, self.font, "black")
+            self.text_rect = self.text.get_rect(center=(self.x, self.y))
+        return self.screen.blit(self.text, self.text_rect)
+
+    @property
+    def label(self) -> str:
+        return f"{self.left_score} - {self.right_score}"
+
+    def invalidate(self):
+        """Called whenever the score changes, drops the rendered score so the next draw redoes it."""
+        if self.text is not None:
+            text_cache.invalidate(text=self.label, font=self.font)
+            self.text = None
 
     def increment_left(self):
+        self.invalidate()
         self.left_score += 1
 
     def increment_right(self):
+        self.invalidate()
         self.right_score += 1
 
     def reset(self):
+        self.invalidate()
         self.left_score = 0
         self.right_score = 0
 
+    def set(self, left: int, right: int):
+        if (left, right) != (self.left_score, self.right_score):
+            self.invalidate()
+            self.left_score, self.right_score = int(left), int(right)
+
 
 class Settings:
     def __init__(self, screen: pygame.Surface):
         self.screen = screen
-        self.font = pygame.font.Font(pygame.font.get_default_font(), 36)
+        self.font = text_cache.font(36)
         self.visible = False
         self.background_color = (200, 200, 200, 128)  # Light gray with some transparency
 
+        # Semi-transparent background, only needs filling once
+        self.overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
+        self.overlay.fill(self.background_color)
+
         # Menu item positions (centered, with spacing)
         self.screen_center = (screen.get_width() / 2, screen.get_height() / 2)
         self.line_height = 50
@@ -131,203 +175,489 @@ class Settings:
             self.button_width,
             self.button_height,
         )
+        self.mode_button = self.reset_button.move(0, self.line_height)
 
-    def render(self, speed: int):
+    def render(self, speed: int, mode: str):
         if not self.visible:
             return
 
-        # Semi-transparent background
-        overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-        overlay.fill(self.background_color)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.overlay, (0, 0))
 
         # Render current speed
-        speed_text = self.font.render(f"Ball Speed: {speed}", True, "black")
+        speed_text = text_cache.render(f"Ball Speed: {speed}", self.font, "black")
         speed_rect = speed_text.get_rect(center=self.positions["speed"])
         self.screen.blit(speed_text, speed_rect)
 
         # Render reset button
         pygame.draw.rect(self.screen, "white", self.reset_button)
         pygame.draw.rect(self.screen, "black", self.reset_button, 5)  # border
-        reset_text = self.font.render("Reset Score", True, "black")
+        reset_text = text_cache.render("Reset Score", self.font, "black")
         reset_rect = reset_text.get_rect(center=self.positions["reset"])
         self.screen.blit(reset_text, reset_rect)
 
-        # Placeholder text for future options
-        coming_soon = self.font.render("More options coming soon...", True, (100, 100, 100))
-        coming_rect = coming_soon.get_rect(center=self.positions["mode"])
-        self.screen.blit(coming_soon, coming_rect)
+        # Render mode button
+        pygame.draw.rect(self.screen, "white", self.mode_button)
+        pygame.draw.rect(self.screen, "black", self.mode_button, 5)  # border
+        mode_text = text_cache.render(mode, self.font, "black")
+        mode_rect = mode_text.get_rect(center=self.positions["mode"])
+        self.screen.blit(mode_text, mode_rect)
 
-    def handle_click(self, pos: tuple[int, int]) -> bool:
-        """Returns True if reset button was clicked"""
+    def handle_click(self, pos: tuple[int, int]) -> Optional[str]:
+        """Returns "reset" or "mode" for the button that was clicked, None otherwise"""
         if not self.visible:
-            return False
-        return self.reset_button.collidepoint(pos)
+            return None
+        if self.reset_button.collidepoint(pos):
+            return "reset"
+        if self.mode_button.collidepoint(pos):
+            return "mode"
+        return None
 
 
 class Pong:
-    def __init__(self, speed: int = 450, latest_winner: Orientation = Orientation.LEFT):
-        self.px_width: int = 720
-        self.px_height: int = 480
+    def __init__(
+        self,
+        speed: int = 450,
+        latest_winner: Orientation = Orientation.LEFT,
+        seed: Optional[int] = None,
+        record: Optional[Path] = None,
+        cpu: Optional[str] = None,
+        chaos: int = 0,
+    ):
+        self.config = PongConfig()
+        self.px_width: int = self.config.width
+        self.px_height: int = self.config.height
         self.screen = pygame.display.set_mode((self.px_width, self.px_height))
         self.screen.fill("gray")
+        self.dirty = DirtyRects(self.screen, "gray")
+        self.sprites = SpriteAtlas(self.define_sprites)
+        self.scheduler = Scheduler()
         self.dt: int = 0
+        self.accumulator: float = 0
+        # the paddle keys with their timestamps, a replay swaps in a RecordedInput
+        self.input: InputTimeline = InputTimeline()
+        self.frame_input: Optional[FrameInput] = None
         self.speed: int = speed
+        self.latest_winner: Orientation = latest_winner
+        # the serve angles are the only randomness, a known seed makes a session replayable
+        self.seed: int = int(np.random.SeedSequence().generate_state(1, np.uint64)[0]) if seed is None else seed
+        winner_side = LEFT if latest_winner == Orientation.LEFT else RIGHT
+        self.sim = PongSimulation(config=self.config, speed=speed, latest_winner=winner_side, seed=self.seed)
+        self.record_path: Optional[Path] = record
+        self.recorder: Optional[InputRecorder] = (
+            InputRecorder(self.seed, speed, winner_side, cpu or "", chaos) if record else None
+        )
+
+        # PvCPU mode, the computer plays the right paddle
+        self.cpu_difficulty: str = cpu or "normal"
+        self.cpu: Optional[CpuController] = None
 
         # Speed indicator properties
-        self.speed_indicator: Optional[FadingText] = None
-        self.speed_font = pygame.font.Font(pygame.font.get_default_font(), 36)
+        self.animator = Animator()
+        self.speed_indicator: Optional[Tween] = None
+        self.speed_font = text_cache.font(36)
 
         # Settings menu
         self.settings = Settings(self.screen)
 
-        self.init_objects()
-
         self.game_start_state: bool = True
-        self.latest_winner: Orientation = latest_winner
         self.running: bool = True
         self.paused: bool = False
 
+        # networked two player mode, see start_netplay
+        self.netplay: Optional["RollbackSession"] = None
+
+        # chaos mode swaps the single ball for a swarm of ``chaos_balls``, toggled with C
+        self.chaos_balls: int = chaos or CHAOS_BALLS
+        self.chaos: Optional[ChaosSimulation] = None
+        self.swarm: Optional[BallSwarm] = None
+        if chaos:
+            self.toggle_chaos()
+        else:
+            self.init_objects()
+        if cpu:
+            self.toggle_cpu()
+
+    def start_netplay(self, session: "RollbackSession"):
+        """Hands the simulation over to ``session``, which steps it in sync with the peer's copy."""
+        self.netplay = session
+        self.sim.auto_serve = True
+        self.sim.serve()
+        self.game_start_state = False
+
+    def reset(self):
+        """Back to waiting for a serve, reusing the window, fonts and game objects.
+
+        Only the simulation arrays and a few flags change, so this is cheap enough to
+        run after every point.
+        """
+        self.sim.reset_positions()
+        self.accumulator = 0
+        self.game_start_state = True
+        self.paused = False
+        self.settings.visible = False
+        self.animator.clear()
+        self.speed_indicator = None
+        self.dirty.invalidate()
+
+    def toggle_cpu(self):
+        """Switches between PvP and PvCPU, the controller's seed comes from the session's for replays."""
+        if self.cpu is None:
+            seed = np.random.SeedSequence([self.seed, 1])
+            # in chaos mode it plays against the swarm, with the one paddle all its balls share
+            self.cpu = CpuController(self.active_sim, RIGHT, DIFFICULTIES[self.cpu_difficulty], seed)
+        else:
+            self.cpu = None
+
+    def define_sprites(self, window_size: tuple[int, int]) -> dict[str, Shape]:
+        cfg = self.config
+        r = cfg.ball_radius
+        return {
+            "paddle": Shape((cfg.paddle_width, cfg.paddle_height), lambda s: s.fill("black"), Blend.OPAQUE),
+            "ball": Shape((2 * r, 2 * r), lambda s: pygame.draw.circle(s, "red", (r, r), r)),
+            # chaos mode blits thousands of these a frame
+            "swarm_ball": Shape(
+                (2 * CHAOS_BALL_RADIUS, 2 * CHAOS_BALL_RADIUS),
+                lambda s: pygame.draw.circle(s, "red", (CHAOS_BALL_RADIUS, CHAOS_BALL_RADIUS), CHAOS_BALL_RADIUS),
+                Blend.COLORKEY,
+            ),
+        }
+
+    def toggle_chaos(self):
+        if self.chaos is None:
+            config = replace(self.config, ball_radius=CHAOS_BALL_RADIUS)
+            seed = np.random.SeedSequence([self.seed, 2])
+            self.chaos = ChaosSimulation(self.chaos_balls, config, self.speed, seed)
+            self.swarm = BallSwarm(self.chaos, self.screen, self.sprites)
+        else:
+            self.chaos = self.swarm = None
+        if self.cpu is not None:
+            # the controller follows the balls of the mode it was made for
+            self.cpu = None
+            self.toggle_cpu()
+        self.init_objects()
+        self.reset()
+
+    @property
+    def active_sim(self) -> PongSimulation:
+        """The simulation the balls in play belong to, the swarm's in chaos mode."""
+        return self.chaos.balls if self.chaos is not None else self.sim
+
+    @property
+    def mode_label(self) -> str:
+        return f"Mode: PvCPU ({self.cpu_difficulty})" if self.cpu else "Mode: PvP"
+
     def __enter__(self):
         self.clock = pygame.time.Clock()
         self.score = Score(self.px_width, self.screen)
+        self.profiler = FrameProfiler()
         pygame.display.set_caption("Pong")
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
+        if self.netplay is not None:
+            self.netplay.close()
+        latency = self.input.latency_summary() if isinstance(self.input, InputTimeline) else {}
+        if latency:
+            Log.info(
+                "Input to display latency over %d key presses: p50 %.1f ms, p95 %.1f ms, max %.1f ms",
+                len(self.input.latency),
+                latency["p50_ms"],
+                latency["p95_ms"],
+                latency["max_ms"],
+            )
+        if self.recorder is not None:
+            self.recorder.finish(self.active_sim)
+            self.recorder.recording().save(self.record_path)
+            Log.info("Recorded %d frames to %s", self.recorder.frame, self.record_path)
+        text_cache.clear()
         pygame.quit()
 
     def init_objects(self):
-        self.left = Paddle(Orientation.LEFT, self.px_width, self.px_height, self.screen)
-        self.right = Paddle(Orientation.RIGHT, self.px_width, self.px_height, self.screen)
+        # in chaos mode the paddles belong to the swarm's field, the single ball sits idle
+        field = self.chaos or self.sim
+        self.left = Paddle(Orientation.LEFT, field, self.screen, self.sprites)
+        self.right = Paddle(Orientation.RIGHT, field, self.screen, self.sprites)
 
         self.left.draw()
         self.right.draw()
 
-        self.ball = Ball(self.px_width, self.px_height, self.screen)
+        self.ball = Ball(self.sim, self.screen, self.sprites)
         self.ball.draw()
 
-    def update_game_state(self):
+    def update_game_state(self, bits: int):
+        """Runs the physics for this frame's ``dt``.
+
+        The paddles follow ``self.input``, which knows when in the frame each key went down
+        or up. Netplay exchanges whole ticks of input and takes ``bits``, the pressed
+        controls from ``key_bits``, instead.
+        """
+        self.frame_input = None
         if self.paused or self.game_start_state:
+            self.input.idle()
+            return
+        if self.netplay is not None:
+            self.input.idle()
+            self.update_netplay(bits)
             return
 
-        keys = pygame.key.get_pressed()
-        movement = self.speed * self.dt
-        if keys[self.left.CONTROL_UP]:
-            self.left.move(-movement)
-        if keys[self.left.CONTROL_DOWN]:
-            self.left.move(movement)
-        if keys[self.right.CONTROL_UP]:
-            self.right.move(-movement)
-        if keys[self.right.CONTROL_DOWN]:
-            self.right.move(movement)
-
-        self.ball.move(self.dt)
-        self.check_collision()
+        # step the physics at a fixed rate, carrying leftover frame time over to the next frame
+        self.accumulator = min(self.accumulator + self.dt, MAX_FRAME_TIME)
+        frame = self.frame_input = self.input.take(int(self.accumulator // FIXED_DT))
+        step = 0
+        while self.accumulator >= FIXED_DT:
+            self.accumulator -= FIXED_DT
+            actions = frame.actions(step)
+            step += 1
+            if self.chaos is not None:
+                if self.cpu is not None:
+                    actions[:, RIGHT] = self.cpu.swarm_action(FIXED_DT)
+                left_points, right_points = self.chaos.step(FIXED_DT, actions)
+                for _ in range(left_points):
+                    self.score.increment_left()
+                for _ in range(right_points):
+                    self.score.increment_right()
+                continue
+            if self.cpu is not None:
+                actions[:, RIGHT] = self.cpu.actions(FIXED_DT)
+            if self.sim.step(FIXED_DT, actions)[0]:
+                self.on_point_scored()
+                return
+
+    def update_netplay(self, bits: int):
+        self.accumulator = min(self.accumulator + self.dt, MAX_FRAME_TIME)
+        used = self.netplay.advance(int(self.accumulator // FIXED_DT), bits)
+        self.accumulator -= used * FIXED_DT
+        # a rollback can take a point back, so the score is read off the simulation
+        self.score.set(*self.sim.scores[0])
+        if self.netplay.peer_left:
+            Log.info("The other player left")
+            self.running = False
 
     def show_speed_indicator(self):
-        self.speed_indicator = create_fading_text(text=f"Speed: {self.speed}", color="black", font=self.speed_font)
+        if self.speed_indicator is not None:
+            self.animator.remove(self.speed_indicator)
+        text = text_cache.render(f"Speed: {self.speed}", self.speed_font, "black")
+        center = (self.px_width / 2, self.px_height / 2)
+        self.speed_indicator = self.animator.add(text, 1.0, center, alpha=(255, 0))
 
-    def render_speed_indicator(self):
-        if self.speed_indicator:
-            current_time = pygame.time.get_ticks() / 1000
-            self.speed_indicator.render(self.screen, (self.px_width / 2, self.px_height / 2), current_time)
-            if not self.speed_indicator.should_render(current_time):
-                self.speed_indicator = None
+    @property
+    def animating(self) -> bool:
+        """Whether frames have to keep coming without input, otherwise the loop sleeps until an event."""
+        return not (self.paused or self.game_start_state) or self.animator.active
 
     def event_handler(self):
-        self.screen.fill("gray")
+        profiler = self.profiler
+        with profiler.phase(FrameProfiler.IDLE):
+            events = self.input.events(self.scheduler.wait(busy=self.animating or self.input.pending))
+        profiler.begin_frame()
+        Log.next_frame()
+        if self.scheduler.idled:
+            # time spent asleep isn't frame time, start measuring from the wake up
+            self.clock.tick()
+        if events:
+            self.scheduler.request_redraw()
+
+        with profiler.phase("events"):
+            self.scheduler.run_timers()
+            for event in events:
+                if self.recorder is not None and self._recordable(event):
+                    self.recorder.record_event(event)
+                self.handle_event(event)
+
+        # paused or waiting to serve with nothing new to show, skip the frame entirely
+        if not self.scheduler.take_redraw() and not self.animating:
+            if self.recorder is not None:
+                self.recorder.end_frame(0, 0.0)
+            profiler.discard_frame()
+            return
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and self.game_start_state:
-                    self.game_start_state = False
-                    self.ball.start(self.speed, self.latest_winner)
-                elif event.key == pygame.K_p:
-                    self.paused = not self.paused
-                    self.settings.visible = False  # Hide settings when unpausing
-                elif event.key == pygame.K_o and self.paused:
+        with profiler.phase("update"):
+            bits = key_bits(pygame.key.get_pressed())
+            self.input.sync(bits)
+            self.update_game_state(bits)
+            if self.recorder is not None:
+                frame = self.frame_input or FrameInput(bits)
+                self.recorder.record_edges(frame.edges)
+                self.recorder.end_frame(frame.bits | STEPPED, self.dt)
+
+        self.render_frame()
+
+        with profiler.phase(FrameProfiler.IDLE):
+            self.dt = self.input.tick(self.clock, 60) / 1000
+        with profiler.phase("present"):
+            self.dirty.present()
+            self.input.presented()
+        profiler.end_frame()
+
+    @staticmethod
+    def _recordable(event: pygame.event.Event) -> bool:
+        if event.type == pygame.KEYDOWN:
+            # the paddle keys are recorded with their timing, as the physics used them
+            return event.key not in DEBUG_KEYS and event.key not in KEYS
+        return event.type == pygame.MOUSEBUTTONDOWN
+
+    def render_frame(self):
+        """Draws the current state into the dirty rects, ``dirty.present`` puts it on screen."""
+        profiler = self.profiler
+        with profiler.phase("draw"):
+            # only the areas drawn last frame get erased, unless the settings overlay covers everything
+            # and in chaos mode, where a full redraw beats thousands of tiny rects
+            self.dirty.clear(full=self.paused and self.settings.visible or self.chaos is not None)
+            self.display_objects()
+
+        with profiler.phase("overlay"):
+            # Show pause indicator if paused
+            if self.paused:
+                pause_text = text_cache.render("PAUSED", text_cache.font(48), "red")
+                pause_rect = pause_text.get_rect()
+                pause_rect.topright = (self.px_width, 0)
+                self.dirty.add(self.screen.blit(pause_text, pause_rect))
+
+                reminder_text = text_cache.render("Press 'O' for settings", text_cache.font(24), "black")
+                reminder_rect = reminder_text.get_rect()
+                reminder_rect.topright = (self.px_width, pause_rect.bottom + 5)  # 5px gap between texts
+                self.dirty.add(self.screen.blit(reminder_text, reminder_rect))
+
+                # Show settings menu if visible
+                self.settings.render(self.speed, self.mode_label)
+
+            # speed indicator and any other effects, fading on their own clock
+            self.dirty.rects(self.animator.draw(self.screen))
+            self.dirty.add(profiler.draw_hud(self.screen, text_cache.font(20)))
+
+    def handle_event(self, event: pygame.event.Event):
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif event.type == pygame.WINDOWEXPOSED:
+            self.dirty.invalidate()
+        elif event.type == pygame.KEYDOWN:
+            if self.netplay is not None and event.key not in DEBUG_KEYS:
+                # pausing, speed and mode changes would only happen on one side of a network game
+                return
+            if event.key == pygame.K_SPACE and self.game_start_state:
+                self.game_start_state = False
+                # the swarm serves itself, the single ball stays hidden in chaos mode
+                if self.chaos is None:
+                    self.ball.start()
+            elif event.key == pygame.K_p:
+                self.paused = not self.paused
+                self.settings.visible = False  # Hide settings when unpausing
+            elif event.key == pygame.K_o and self.paused:
+                self.settings.visible = not self.settings.visible
+            elif event.key == pygame.K_c:
+                self.toggle_chaos()
+            elif event.key == pygame.K_F3:
+                self.profiler.toggle_hud()
+            elif event.key == pygame.K_F4:
+                self.profiler.export_default()
+            elif event.key == pygame.K_F5:
+                Log.dump_events(time.strftime("events-%Y%m%d-%H%M%S.jsonl"))
+            elif event.unicode == "+":
+                self.speed += 30
+                self.set_speed(self.speed)
+                if not self.settings.visible:
+                    self.show_speed_indicator()
+            elif event.unicode == "-":
+                self.speed = max(self.speed - 30, MIN_SPEED)
+                self.set_speed(self.speed)
+                if not self.settings.visible:
+                    self.show_speed_indicator()
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if self.paused:
+                clicked = self.settings.handle_click(event.pos)
+                if clicked == "reset":
+                    self.score.reset()
+                    self.reset()
+                elif clicked == "mode":
+                    self.toggle_cpu()
+                else:
                     self.settings.visible = not self.settings.visible
-                elif event.unicode == "+":
-                    old_speed = self.speed
-                    self.speed += 30
-                    self.ball.velocity.x *= self.speed / old_speed
-                    if not self.settings.visible:
-                        self.show_speed_indicator()
-                elif event.unicode == "-":
-                    old_speed = self.speed
-                    self.speed -= 30
-                    self.ball.velocity.x *= self.speed / old_speed
-                    if not self.settings.visible:
-                        self.show_speed_indicator()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if self.paused:
-                    if self.settings.visible and self.settings.handle_click(event.pos):
-                        self.score.reset()
-                        self.restart()
-                    else:
-                        self.settings.visible = not self.settings.visible
-
-        self.update_game_state()
-        self.display_objects()
-
-        # Show pause indicator if paused
-        if self.paused:
-            pause_font = pygame.font.Font(pygame.font.get_default_font(), 48)
-            pause_text = pause_font.render("PAUSED", True, "red")
-            pause_rect = pause_text.get_rect()
-            pause_rect.topright = (self.px_width, 0)
-            self.screen.blit(pause_text, pause_rect)
-
-            reminder_font = pygame.font.Font(pygame.font.get_default_font(), 24)
-            reminder_text = reminder_font.render("Press 'O' for settings", True, "black")
-            reminder_rect = reminder_text.get_rect()
-            reminder_rect.topright = (self.px_width, pause_rect.bottom + 5)  # 5px gap between texts
-            self.screen.blit(reminder_text, reminder_rect)
-
-            # Show settings menu if visible
-            self.settings.render(self.speed)
-
-        # Render speed indicator with fade effect
-        self.render_speed_indicator()
-
-        self.dt = self.clock.tick(60) / 1000
-        pygame.display.flip()
 
-    def display_objects(self):
-        self.left.draw()
-        self.right.draw()
-        self.ball.draw()
-        self.score.draw()
+    def set_speed(self, speed: int):
+        self.sim.set_speed(speed)
+        if self.chaos is not None:
+            self.chaos.set_speed(speed)
 
-    def check_collision(self):
-        if self.ball.hit_box.colliderect(self.left.rect) or self.ball.hit_box.colliderect(self.right.rect):
-            self.ball.bounce_x()
-
-        if self.ball.y - self.ball.radius <= 0 or self.ball.y + self.ball.radius >= self.px_height:
-            self.ball.bounce_y()
+    def display_objects(self):
+        self.dirty.add(self.left.draw())
+        self.dirty.add(self.right.draw())
+        if self.swarm is not None:
+            self.swarm.draw()
+        else:
+            self.dirty.add(self.ball.draw())
+        self.dirty.add(self.score.draw())
 
-        if self.ball.x < 0:
+    def on_point_scored(self):
+        Log.event("point", winner="right" if self.sim.latest_winner[0] == RIGHT else "left")
+        if self.sim.latest_winner[0] == RIGHT:
             self.score.increment_right()
             self.latest_winner = Orientation.RIGHT
-            self.restart()
-        elif self.ball.x > self.px_width:
+        else:
             self.score.increment_left()
             self.latest_winner = Orientation.LEFT
-            self.restart()
-
-    def restart(self):
-        self.__init__(self.speed, self.latest_winner)
+        self.reset()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Two player Pong")
+    parser.add_argument("--record", type=Path, help="save the session's inputs here, replay with pong.replay")
+    parser.add_argument("--seed", type=int, help="seed for the serve angles, random by default")
+    parser.add_argument("--cpu", choices=DIFFICULTIES, help="play against the computer at this difficulty")
+    parser.add_argument("--chaos", type=int, default=0, help="start in chaos mode with this many balls")
+    parser.add_argument(
+        "--input-poll",
+        type=float,
+        default=4,
+        help="ms between key event checks while a frame waits, finer key timing for more wake ups, 0 turns it off",
+    )
+    network = parser.add_argument_group("netplay")
+    network.add_argument(
+        "--host",
+        metavar="[HOST:]PORT",
+        help="wait for the other player on this address, every interface when only the port is given",
+    )
+    network.add_argument("--join", metavar="HOST:PORT", help="play against the host at this address")
+    network.add_argument("--delay", type=int, default=2, help="input delay in ticks of 1/120 s")
+    network.add_argument("--latency", type=float, default=0, help="simulated one way latency in ms")
+    network.add_argument("--jitter", type=float, default=0, help="simulated extra latency of up to this many ms")
+    network.add_argument("--loss", type=float, default=0, help="simulated fraction of packets lost")
+    args = parser.parse_args()
+
     pygame.init()
-    with Pong() as game:
+    Log.record_events()
+    if args.host or args.join:
+        play_netplay(args)
+        return
+    with Pong(seed=args.seed, record=args.record, cpu=args.cpu, chaos=args.chaos) as game:
+        game.input.poll_interval = args.input_poll / 1000
         while game.running:
             game.event_handler()
 
 
+def play_netplay(args: argparse.Namespace):
+    """The host plays the left paddle and picks the seed, whoever joins plays the right."""
+    from pong.netplay import Conditions, Link, RollbackSession, host, join, parse_address
+
+    conditions = Conditions(args.latency / 1000, args.jitter / 1000, args.loss)
+    if args.host:
+        # a bare port is for a player on another machine, not only this one
+        link = Link(parse_address(args.host, "0.0.0.0"), conditions=conditions)
+    else:
+        link = Link(("0.0.0.0", 0), parse_address(args.join), conditions)
+    with link:
+        if args.host:
+            seed = int(np.random.SeedSequence(args.seed).generate_state(1, np.uint64)[0])
+            speed = 450
+            welcome = host(link, seed, speed)
+            side = LEFT
+        else:
+            seed, speed = join(link)
+            welcome, side = None, RIGHT
+        with Pong(speed, seed=seed) as game:
+            game.start_netplay(RollbackSession(game.sim, link, side, args.delay, welcome=welcome))
+            while game.running:
+                game.event_handler()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,341 @@
+import asyncio
+import random
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from queue import Empty, SimpleQueue
+from typing import Optional
+import numpy as np
+from utils.logging import Log
+from pong.simulation import FIXED_DT, LEFT, RIGHT, PongSimulation, SimState
+
+# A peer's input for one tick is a single byte of these bits for its own paddle
+UP = 1
+DOWN = 2
+
+# Every packet starts with HEADER: magic, kind, the first tick of the inputs that follow,
+# the last tick of the receiver's inputs the sender has (the ack), the sender's current
+# tick and how many ticks it is ahead of the receiver by its own reckoning. INPUTS packets
+# carry one byte per tick from the first unacknowledged one on, so a lost packet is made
+# up for by the next one. WELCOME adds the session's seed and speed.
+HEADER = struct.Struct("<4sBiiib")
+WELCOME_BODY = struct.Struct("<QI")
+MAGIC = b"PNP1"
+HELLO, WELCOME, INPUTS, BYE = range(4)
+# inputs resent per packet until acknowledged
+MAX_INPUTS = 64
+# ticks of inputs and snapshots kept, way more than a rollback can go back
+HISTORY = 256
+# how far the simulation may run on predicted input before it waits for the peer
+MAX_ROLLBACK = 30
+
+
+def local_bits(bits: int) -> int:
+    """Either set of paddle keys from ``pong.recording.key_bits`` moves the local player's paddle."""
+    up = bits & 0b0101
+    down = bits & 0b1010
+    return (UP if up else 0) | (DOWN if down else 0)
+
+
+def direction(bits: np.ndarray) -> np.ndarray:
+    return (bits >> 1 & 1).astype(np.int8) - (bits & 1).astype(np.int8)
+
+
+@dataclass
+class Conditions:
+    """A stand-in for a bad network, applied to everything a ``Link`` sends."""
+
+    # one way, the round trip is twice this when both peers use the same conditions
+    latency: float = 0.0
+    jitter: float = 0.0
+    loss: float = 0.0
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, link: "Link"):
+        self.link = link
+
+    def datagram_received(self, data: bytes, addr):
+        if self.link.remote is None:
+            # the host learns where its peer is from the first packet
+            self.link.remote = addr
+        if addr == self.link.remote:
+            self.link.received.put(data)
+
+
+class Link:
+    """A UDP socket served by an asyncio loop on a background thread.
+
+    The game loop stays synchronous: ``send`` hands datagrams to the asyncio thread and
+    ``poll`` drains what arrived since the last frame, neither blocks. ``Conditions``
+    delay and drop outgoing packets so netplay can be tried out on localhost.
+    """
+
+    def __init__(
+        self,
+        local: tuple[str, int],
+        remote: Optional[tuple[str, int]] = None,
+        conditions: Optional[Conditions] = None,
+        seed: Optional[int] = None,
+    ):
+        self.local: tuple[str, int] = local
+        self.remote: Optional[tuple[str, int]] = remote
+        self.conditions: Conditions = conditions if conditions is not None else Conditions()
+        self.rng = random.Random(seed)
+        self.received: SimpleQueue[bytes] = SimpleQueue()
+        self.sent: int = 0
+        self.dropped: int = 0
+        self._loop = asyncio.new_event_loop()
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._thread = threading.Thread(target=self._loop.run_forever, name="netplay", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        future = asyncio.run_coroutine_threadsafe(
+            self._loop.create_datagram_endpoint(lambda: _Protocol(self), local_addr=self.local), self._loop
+        )
+        self._transport, _ = future.result()
+        self.local = self._transport.get_extra_info("sockname")[:2]
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._loop.call_soon_threadsafe(self._transport.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=1)
+
+    def send(self, data: bytes):
+        self._loop.call_soon_threadsafe(self._send, data)
+
+    def _send(self, data: bytes):
+        if self.remote is None or self._transport.is_closing():
+            return
+        self.sent += 1
+        conditions = self.conditions
+        if conditions.loss and self.rng.random() < conditions.loss:
+            self.dropped += 1
+            return
+        delay = conditions.latency + self.rng.uniform(0, conditions.jitter)
+        if delay > 0:
+            self._loop.call_later(delay, self._deliver, data, self.remote)
+        else:
+            self._transport.sendto(data, self.remote)
+
+    def _deliver(self, data: bytes, remote: tuple[str, int]):
+        if not self._transport.is_closing():
+            self._transport.sendto(data, remote)
+
+    def poll(self) -> list[bytes]:
+        packets = []
+        while True:
+            try:
+                packets.append(self.received.get_nowait())
+            except Empty:
+                return packets
+
+    def receive(self, timeout: float) -> Optional[bytes]:
+        try:
+            return self.received.get(timeout=timeout)
+        except Empty:
+            return None
+
+
+def packet(kind: int, start: int = 0, ack: int = -1, now: int = 0, advantage: int = 0, body: bytes = b"") -> bytes:
+    return HEADER.pack(MAGIC, kind, start, ack, now, max(-128, min(127, advantage))) + body
+
+
+def host(link: Link, seed: int, speed: int, timeout: float = 60) -> bytes:
+    """Waits for a peer to say hello and welcomes it, returns the welcome to resend if it got lost."""
+    welcome = packet(WELCOME, body=WELCOME_BODY.pack(seed, speed))
+    deadline = time.monotonic() + timeout
+    Log.info("Waiting for a peer on %s:%d", *link.local)
+    while time.monotonic() < deadline:
+        data = link.receive(timeout=0.25)
+        if data is not None and data[:4] == MAGIC and data[4] == HELLO:
+            link.send(welcome)
+            Log.info("Peer joined from %s:%d", *link.remote)
+            return welcome
+    raise TimeoutError("Nobody joined")
+
+
+def join(link: Link, timeout: float = 10) -> tuple[int, int]:
+    """Says hello until the host answers, returns the session's seed and speed."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        link.send(packet(HELLO))
+        data = link.receive(timeout=0.25)
+        if data is not None and data[:4] == MAGIC and data[4] == WELCOME:
+            return WELCOME_BODY.unpack_from(data, HEADER.size)
+    raise TimeoutError(f"No answer from {link.remote[0]}:{link.remote[1]}")
+
+
+@dataclass
+class RollbackStats:
+    rollbacks: int = 0
+    resimulated: int = 0
+    deepest: int = 0
+    stalls: int = 0
+    # ticks skipped to let a peer that is behind catch up
+    yielded: int = 0
+    rollback_time: float = 0.0
+
+    def __str__(self) -> str:
+        mean = self.rollback_time / self.rollbacks * 1000 if self.rollbacks else 0.0
+        return (
+            f"{self.rollbacks} rollbacks resimulating {self.resimulated} ticks (deepest {self.deepest}, "
+            f"{mean:.3f} ms on average), {self.stalls} stalls, {self.yielded} ticks yielded"
+        )
+
+
+class RollbackSession:
+    """Keeps a ``PongSimulation`` in step with a peer's by exchanging only input bits.
+
+    Each tick's inputs live in a ring of ``HISTORY`` ticks. The local player's input
+    for a tick is set ``input_delay`` ticks ahead of it. The peer's is predicted to be
+    the same as its last known one, so the game never waits for the network. Before
+    every tick the state is kept as a ``SimState`` snapshot. When a peer's input turns
+    out different from the prediction, the simulation is restored to the snapshot of
+    that tick and the ticks since are resimulated, usually a handful of ``step`` calls
+    on a single game.
+    """
+
+    def __init__(
+        self,
+        sim: PongSimulation,
+        link: Link,
+        side: int,
+        input_delay: int = 2,
+        max_rollback: int = MAX_ROLLBACK,
+        welcome: Optional[bytes] = None,
+    ):
+        self.sim: PongSimulation = sim
+        self.link: Link = link
+        self.side: int = side
+        self.remote_side: int = RIGHT if side == LEFT else LEFT
+        self.input_delay: int = input_delay
+        self.max_rollback: int = max_rollback
+        # the host resends its welcome whenever the peer is still saying hello
+        self.welcome: Optional[bytes] = welcome
+
+        self.tick: int = 0
+        self.inputs = np.zeros((HISTORY, 2), dtype=np.uint8)
+        self.snapshots: list[Optional[SimState]] = [None] * HISTORY
+        # last ticks with known input, local ones are no input until the delay has passed
+        self.local_confirmed: int = input_delay - 1
+        self.remote_confirmed: int = -1
+        self.peer_ack: int = -1
+        self.peer_tick: int = 0
+        self.peer_advantage: int = 0
+        self.peer_left: bool = False
+        self.rollback_to: Optional[int] = None
+        self.stats = RollbackStats()
+        self._actions = np.zeros((1, 2))
+
+    @property
+    def advantage(self) -> int:
+        """How many ticks ahead of the peer this side is, going by the peer's last packet."""
+        return self.tick - self.peer_tick
+
+    def advance(self, ticks: int, keys: int) -> int:
+        """Runs up to ``ticks`` ticks with the local player holding the paddle ``keys`` (``key_bits``).
+
+        Returns how many of them are used up. Ticks it had to wait on the peer for are
+        not, so the caller can carry them over to the next frame.
+        """
+        self.receive()
+        if self.rollback_to is not None:
+            self._rollback()
+
+        bits = local_bits(keys)
+        used = 0
+        # when both sides see this one ahead, it skips a tick now and then until they agree
+        if ticks and (self.advantage - self.peer_advantage) // 2 >= 1:
+            used += 1
+            self.stats.yielded += 1
+
+        while used < ticks:
+            if self.tick - self.remote_confirmed > self.max_rollback or (
+                self.tick + self.input_delay - self.peer_ack >= HISTORY
+            ):
+                self.stats.stalls += 1
+                break
+            t = self.tick + self.input_delay
+            self.inputs[t % HISTORY, self.side] = bits
+            self.local_confirmed = t
+            self._step()
+            used += 1
+        self.send()
+        return used
+
+    def _step(self):
+        t = self.tick
+        slot = t % HISTORY
+        self.snapshots[slot] = self.sim.snapshot()
+        if t > self.remote_confirmed:
+            last = self.inputs[self.remote_confirmed % HISTORY, self.remote_side] if self.remote_confirmed >= 0 else 0
+            self.inputs[slot, self.remote_side] = last
+        self._actions[0] = direction(self.inputs[slot])
+        self.sim.step(FIXED_DT, self._actions)
+        self.tick += 1
+
+    def _rollback(self):
+        start = time.perf_counter()
+        first, end = self.rollback_to, self.tick
+        self.rollback_to = None
+        self.sim.restore(self.snapshots[first % HISTORY])
+        self.tick = first
+        while self.tick < end:
+            self._step()
+        stats = self.stats
+        stats.rollbacks += 1
+        stats.resimulated += end - first
+        stats.deepest = max(stats.deepest, end - first)
+        stats.rollback_time += time.perf_counter() - start
+
+    def receive(self):
+        for data in self.link.poll():
+            if len(data) < HEADER.size:
+                continue
+            magic, kind, start, ack, now, advantage = HEADER.unpack_from(data)
+            if magic != MAGIC:
+                continue
+            if kind == HELLO and self.welcome is not None:
+                self.link.send(self.welcome)
+            elif kind == BYE:
+                self.peer_left = True
+            elif kind == INPUTS:
+                self.peer_ack = max(self.peer_ack, ack)
+                if now >= self.peer_tick:
+                    self.peer_tick, self.peer_advantage = now, advantage
+                self._remote_inputs(start, np.frombuffer(data, np.uint8, offset=HEADER.size))
+
+    def _remote_inputs(self, start: int, bits: np.ndarray):
+        # packets start at the first input we haven't acknowledged, anything older is a duplicate
+        first = self.remote_confirmed + 1
+        if start > first or start + len(bits) <= first:
+            return
+        bits = bits[first - start :]
+        ticks = np.arange(first, first + len(bits))
+        slots = ticks % HISTORY
+        mispredicted = (ticks < self.tick) & (self.inputs[slots, self.remote_side] != bits)
+        if mispredicted.any():
+            tick = int(ticks[mispredicted.argmax()])
+            self.rollback_to = tick if self.rollback_to is None else min(self.rollback_to, tick)
+        self.inputs[slots, self.remote_side] = bits
+        self.remote_confirmed = int(ticks[-1])
+
+    def send(self):
+        start = self.peer_ack + 1
+        n = min(MAX_INPUTS, self.local_confirmed - self.peer_ack)
+        bits = self.inputs[np.arange(start, start + n) % HISTORY, self.side]
+        self.link.send(packet(INPUTS, start, self.remote_confirmed, self.tick, self.advantage, bits.tobytes()))
+
+    def close(self):
+        self.link.send(packet(BYE))
+        Log.info("Netplay: %s, %d/%d packets dropped", self.stats, self.link.dropped, self.link.sent)
+
+
+def parse_address(address: str, default_host: str = "127.0.0.1") -> tuple[str, int]:
+    """``HOST:PORT`` as a socket address, ``default_host`` when only the port is given."""
+    hostname, _, port = address.rpartition(":")
+    return hostname or default_host, int(port)
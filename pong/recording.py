@@ -0,0 +1,200 @@
+import hashlib
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
+import pygame
+from pong.simulation import PongSimulation
+
+# A recording is HEADER, then per frame one INPUT byte and one float64 dt, then the
+# EVENT_DTYPE records and finally the DIGEST_SIZE byte digest of the simulation state
+# at the end of the session. Everything the game logic reads is in there, the RNG
+# seed included, so replaying it reproduces the session bit for bit. The input byte
+# holds the paddle keys down when the frame's physics started, their presses and
+# releases during it are KEYDOWN and KEYUP records with their offset in seconds.
+HEADER = struct.Struct("<8sHQiB8sIII")
+MAGIC = b"PONGREC\0"
+VERSION = 4
+DIGEST_SIZE = 20
+
+# bits of the per frame input byte, in the order of KEYS
+KEYS: tuple[int, ...] = (pygame.K_w, pygame.K_s, pygame.K_UP, pygame.K_DOWN)
+# a paddle key press or release: (seconds, index of the key in KEYS, pressed)
+Edge = tuple[float, int, bool]
+# set when the frame ran the game logic, skipped frames (paused and idle) only handle events
+STEPPED = 0x80
+
+EVENT_DTYPE = np.dtype(
+    [
+        ("frame", "<u4"),
+        ("type", "<u4"),
+        ("key", "<i4"),
+        ("unicode", "<u4"),
+        ("x", "<i2"),
+        ("y", "<i2"),
+        ("offset", "<f8"),
+    ]
+)
+
+
+def key_bits(keys) -> int:
+    """Packs the paddle controls of a ``pygame.key.get_pressed()`` result into one byte."""
+    bits = 0
+    for i, key in enumerate(KEYS):
+        if keys[key]:
+            bits |= 1 << i
+    return bits
+
+
+def actions_from_bits(bits: int) -> np.ndarray:
+    """The (1, 2) action array ``PongSimulation.step`` takes, down minus up for each paddle."""
+    return np.array([[(bits >> 1 & 1) - (bits & 1), (bits >> 3 & 1) - (bits >> 2 & 1)]])
+
+
+def state_digest(sim: PongSimulation) -> bytes:
+    state = sim.snapshot()
+    digest = hashlib.sha1()
+    for array in (state.paddle_y, state.ball_pos, state.ball_vel, state.speed, state.scores, state.latest_winner):
+        digest.update(array.tobytes())
+    return digest.digest()
+
+
+@dataclass
+class Recording:
+    """A recorded session: starting parameters, per frame inputs and events, final state digest."""
+
+    seed: int
+    speed: int
+    latest_winner: int
+    # CPU difficulty the session started with, empty for PvP
+    cpu: str
+    # balls in chaos mode at the start, 0 for a normal game
+    chaos: int
+    inputs: np.ndarray
+    dts: np.ndarray
+    events: np.ndarray
+    digest: bytes = bytes(DIGEST_SIZE)
+
+    @property
+    def n_frames(self) -> int:
+        return len(self.inputs)
+
+    def events_by_frame(self) -> list[np.ndarray]:
+        """Each frame's events, in the order they were handled."""
+        bounds = np.searchsorted(self.events["frame"], np.arange(self.n_frames + 1))
+        return [self.events[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    def save(self, path: Path):
+        with open(path, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    self.seed,
+                    self.speed,
+                    self.latest_winner,
+                    self.cpu.encode(),
+                    self.chaos,
+                    self.n_frames,
+                    len(self.events),
+                )
+            )
+            f.write(self.inputs.astype(np.uint8).tobytes())
+            f.write(self.dts.astype("<f8").tobytes())
+            f.write(self.events.astype(EVENT_DTYPE).tobytes())
+            f.write(self.digest)
+
+    @classmethod
+    def load(cls, path: Path) -> "Recording":
+        data = Path(path).read_bytes()
+        magic, version, seed, speed, latest_winner, cpu, chaos, n_frames, n_events = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Pong recording")
+        offset = HEADER.size
+        inputs = np.frombuffer(data, np.uint8, n_frames, offset)
+        offset += inputs.nbytes
+        dts = np.frombuffer(data, "<f8", n_frames, offset)
+        offset += dts.nbytes
+        events = np.frombuffer(data, EVENT_DTYPE, n_events, offset)
+        offset += events.nbytes
+        cpu = cpu.rstrip(b"\0").decode()
+        digest = data[offset : offset + DIGEST_SIZE]
+        return cls(seed, speed, latest_winner, cpu, chaos, inputs, dts, events, digest)
+
+
+class InputRecorder:
+    """Appends a session's inputs to growable NumPy arrays, one byte and one float per frame."""
+
+    def __init__(self, seed: int, speed: int, latest_winner: int, cpu: str = "", chaos: int = 0, capacity: int = 4096):
+        self.seed: int = seed
+        self.speed: int = speed
+        self.latest_winner: int = latest_winner
+        self.cpu: str = cpu
+        self.chaos: int = chaos
+        self.frame: int = 0
+        self._inputs = np.zeros(capacity, dtype=np.uint8)
+        self._dts = np.zeros(capacity, dtype=np.float64)
+        self._events = np.zeros(64, dtype=EVENT_DTYPE)
+        self._n_events: int = 0
+        self.digest: bytes = bytes(DIGEST_SIZE)
+
+    def record_event(self, event: pygame.event.Event):
+        """Adds a KEYDOWN or MOUSEBUTTONDOWN event to the current frame."""
+        if event.type == pygame.KEYDOWN:
+            record = (self.frame, event.type, event.key, ord(event.unicode) if event.unicode else 0, 0, 0, 0.0)
+        else:
+            record = (self.frame, event.type, 0, 0, *event.pos, 0.0)
+        self._append(record)
+
+    def record_edges(self, edges: list[Edge]):
+        """Adds the paddle key presses and releases the current frame's physics used."""
+        for offset, i, pressed in edges:
+            self._append((self.frame, pygame.KEYDOWN if pressed else pygame.KEYUP, KEYS[i], 0, 0, 0, offset))
+
+    def _append(self, record: tuple):
+        if self._n_events == len(self._events):
+            self._events = np.resize(self._events, 2 * len(self._events))
+        self._events[self._n_events] = record
+        self._n_events += 1
+
+    def end_frame(self, bits: int, dt: float):
+        """Closes the current frame with its input byte and the ``dt`` the logic stepped by."""
+        if self.frame == len(self._inputs):
+            self._inputs = np.resize(self._inputs, 2 * self.frame)
+            self._dts = np.resize(self._dts, 2 * self.frame)
+        self._inputs[self.frame] = bits
+        self._dts[self.frame] = dt
+        self.frame += 1
+
+    def finish(self, sim: PongSimulation):
+        self.digest = state_digest(sim)
+
+    def recording(self) -> Recording:
+        return Recording(
+            self.seed,
+            self.speed,
+            self.latest_winner,
+            self.cpu,
+            self.chaos,
+            self._inputs[: self.frame].copy(),
+            self._dts[: self.frame].copy(),
+            self._events[: self._n_events].copy(),
+            self.digest,
+        )
+
+
+def split_edges(records: np.ndarray) -> tuple[np.ndarray, list[Edge]]:
+    """Separates a frame's records into the events to handle and the paddle key edges."""
+    is_edge = np.isin(records["key"], KEYS)
+    edges = [
+        (float(record["offset"]), KEYS.index(int(record["key"])), bool(record["type"] == pygame.KEYDOWN))
+        for record in records[is_edge]
+    ]
+    return records[~is_edge], edges
+
+
+def event_from_record(record) -> pygame.event.Event:
+    if record["type"] == pygame.KEYDOWN:
+        unicode = chr(record["unicode"]) if record["unicode"] else ""
+        return pygame.event.Event(pygame.KEYDOWN, key=int(record["key"]), unicode=unicode, mod=0, scancode=0)
+    return pygame.event.Event(int(record["type"]), pos=(int(record["x"]), int(record["y"])), button=1)
@@ -0,0 +1,89 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pygame
+from utils.logging import Log
+from pong.main import Orientation, Pong
+from pong.input import FrameInput, RecordedInput
+from pong.recording import STEPPED, Recording, event_from_record, split_edges, state_digest
+from pong.simulation import LEFT
+
+
+def replay(recording: Recording, render: bool = False, time_scale: float = 1.0) -> bytes:
+    """Feeds a recording through the game logic and returns the digest of the final state.
+
+    Headless it runs as fast as the logic allows; with ``render`` every stepped frame is
+    drawn and paced at ``time_scale`` times the recorded speed.
+    """
+    pygame.init()
+    winner = Orientation.LEFT if recording.latest_winner == LEFT else Orientation.RIGHT
+    with Pong(recording.speed, winner, seed=recording.seed, cpu=recording.cpu or None, chaos=recording.chaos) as game:
+        game.input = RecordedInput()
+        for bits, dt, records in zip(recording.inputs, recording.dts, recording.events_by_frame()):
+            events, edges = split_edges(records)
+            for record in events:
+                game.handle_event(event_from_record(record))
+            if not bits & STEPPED:
+                continue
+            game.input.frame = FrameInput(int(bits) & ~STEPPED, edges)
+            game.dt = float(dt)
+            game.update_game_state(int(bits))
+            if render:
+                pygame.event.pump()
+                game.render_frame()
+                game.dirty.present()
+                time.sleep(dt / time_scale)
+        return state_digest(game.active_sim)
+
+
+def replay_file(path: Path) -> tuple[Path, int, bool, float]:
+    """Replays ``path`` headless: (path, frames, whether the final state matches, seconds)."""
+    start = time.perf_counter()
+    recording = Recording.load(path)
+    digest = replay(recording)
+    return path, recording.n_frames, digest == recording.digest, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Pong sessions and check they end bit identical")
+    parser.add_argument("recordings", type=Path, nargs="+")
+    parser.add_argument("--render", action="store_true", help="show the first recording instead of checking all")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="playback speed when rendering")
+    parser.add_argument("--workers", type=int, help="processes replaying headless, defaults to all cores")
+    args = parser.parse_args()
+
+    if args.render:
+        replay(Recording.load(args.recordings[0]), render=True, time_scale=args.time_scale)
+        return
+
+    # set before any worker starts pygame, replays never open a real window
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    start = time.perf_counter()
+    frames = 0
+    mismatches = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for path, n_frames, matches, elapsed in pool.map(replay_file, args.recordings):
+            frames += n_frames
+            if not matches:
+                mismatches += 1
+                Log.error("%s: final state differs from the recording", path)
+            else:
+                Log.debug("%s: %d frames in %.3fs", path, n_frames, elapsed)
+    elapsed = time.perf_counter() - start
+    Log.info(
+        "Replayed %d recordings, %d frames in %.2fs (%.0f frames/s), %d mismatched",
+        len(args.recordings),
+        frames,
+        elapsed,
+        frames / elapsed,
+        mismatches,
+    )
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
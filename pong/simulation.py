@@ -0,0 +1,250 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional
+
+# column indices into the per-side arrays (paddle_y, scores, ...)
+LEFT = 0
+RIGHT = 1
+
+# physics runs at a fixed rate regardless of the render frame rate
+FIXED_DT = 1 / 120
+# the longest frame we try to catch up on, so a stall doesn't snowball into more stepping
+MAX_FRAME_TIME = 0.25
+# collisions resolved per step; a ball would need to be absurdly fast to hit more in 1/120 s
+MAX_BOUNCES = 4
+# the slowest the game goes, ``set_speed`` rescales the ball by the ratio of speeds
+MIN_SPEED = 30
+
+
+def _slab(lo: np.ndarray, hi: np.ndarray, p: np.ndarray, v: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Entry and exit times of a point moving at ``v`` through the interval [lo, hi]."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = (lo - p) / v
+        t2 = (hi - p) / v
+    still = v == 0
+    inside = (p >= lo) & (p <= hi)
+    near = np.where(still, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+    far = np.where(still, np.inf, np.maximum(t1, t2))
+    return near, far
+
+
+@dataclass(frozen=True)
+class PongConfig:
+    width: int = 720
+    height: int = 480
+    paddle_width: int = 10
+    paddle_height: int = 100
+    ball_radius: int = 10
+
+
+@dataclass(frozen=True)
+class SimState:
+    """Copy of everything ``step`` and ``serve`` change, see ``PongSimulation.snapshot``."""
+
+    paddle_y: np.ndarray
+    ball_pos: np.ndarray
+    ball_vel: np.ndarray
+    speed: np.ndarray
+    scores: np.ndarray
+    serving: np.ndarray
+    latest_winner: np.ndarray
+    rng_state: dict
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (
+            self.paddle_y,
+            self.ball_pos,
+            self.ball_vel,
+            self.speed,
+            self.scores,
+            self.serving,
+            self.latest_winner,
+        )
+        return sum(a.nbytes for a in arrays)
+
+
+class PongSimulation:
+    """Steps ``n_games`` independent Pong games at once, no pygame required.
+
+    All state lives in NumPy arrays with the game index as the first axis, so a
+    single ``step`` advances every game. A game that is waiting for a serve
+    (``serving``) does not move until ``serve`` is called for it.
+
+    Ball collisions are swept over the whole step, so the outcome doesn't depend
+    on the step size; drive it with ``FIXED_DT`` steps anyway to keep paddle
+    movement reproducible.
+    """
+
+    def __init__(
+        self,
+        n_games: int = 1,
+        config: Optional[PongConfig] = None,
+        speed: float = 450,
+        latest_winner: int = LEFT,
+        auto_serve: bool = False,
+        seed: Optional[int] = None,
+    ):
+        config = config if config is not None else PongConfig()
+        self.n_games: int = n_games
+        self.config: PongConfig = config
+        self.auto_serve: bool = auto_serve
+        self.rng = np.random.default_rng(seed)
+
+        self.paddle_x = np.array([0, config.width - config.paddle_width], dtype=np.float64)
+        self.paddle_y = np.empty((n_games, 2), dtype=np.float64)
+        self.ball_pos = np.empty((n_games, 2), dtype=np.float64)
+        self.ball_vel = np.zeros((n_games, 2), dtype=np.float64)
+        self.speed = np.full(n_games, speed, dtype=np.float64)
+        self.scores = np.zeros((n_games, 2), dtype=np.int64)
+        self.serving = np.ones(n_games, dtype=bool)
+        self.latest_winner = np.full(n_games, latest_winner, dtype=np.int8)
+
+        self.reset_positions()
+        if auto_serve:
+            self.serve()
+
+    def _mask(self, mask: Optional[np.ndarray]) -> np.ndarray:
+        return np.ones(self.n_games, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+
+    def reset_positions(self, mask: Optional[np.ndarray] = None):
+        """Puts the ball and paddles back in the middle and waits for a serve."""
+        mask = self._mask(mask)
+        cfg = self.config
+        self.paddle_y[mask] = cfg.height / 2 - cfg.paddle_height / 2
+        self.ball_pos[mask] = (cfg.width / 2, cfg.height / 2)
+        self.ball_vel[mask] = 0
+        self.serving[mask] = True
+
+    def snapshot(self) -> SimState:
+        """The mutable state of every game, a few small array copies."""
+        return SimState(
+            self.paddle_y.copy(),
+            self.ball_pos.copy(),
+            self.ball_vel.copy(),
+            self.speed.copy(),
+            self.scores.copy(),
+            self.serving.copy(),
+            self.latest_winner.copy(),
+            self.rng.bit_generator.state,
+        )
+
+    def restore(self, state: SimState):
+        """Rewinds to ``state`` in place, so views of the arrays held elsewhere stay valid."""
+        np.copyto(self.paddle_y, state.paddle_y)
+        np.copyto(self.ball_pos, state.ball_pos)
+        np.copyto(self.ball_vel, state.ball_vel)
+        np.copyto(self.speed, state.speed)
+        np.copyto(self.scores, state.scores)
+        np.copyto(self.serving, state.serving)
+        np.copyto(self.latest_winner, state.latest_winner)
+        self.rng.bit_generator.state = state.rng_state
+
+    def reset_scores(self, mask: Optional[np.ndarray] = None):
+        self.scores[self._mask(mask)] = 0
+
+    def serve(self, mask: Optional[np.ndarray] = None):
+        """Launches the ball towards the latest winner in every masked game that is waiting to serve."""
+        mask = self._mask(mask) & self.serving
+        n = int(np.count_nonzero(mask))
+        if not n:
+            return
+        speed = self.speed[mask]
+        self.ball_vel[mask, 0] = np.where(self.latest_winner[mask] == RIGHT, speed, -speed)
+        self.ball_vel[mask, 1] = speed * self.rng.uniform(-0.5, 0.5, size=n)
+        self.serving[mask] = False
+
+    def set_speed(self, speed: float, mask: Optional[np.ndarray] = None):
+        """Changes the game speed, rescaling the horizontal ball velocity to match."""
+        if speed <= 0:
+            raise ValueError(f"speed must be positive, got {speed}")
+        mask = self._mask(mask)
+        self.ball_vel[mask, 0] *= speed / self.speed[mask]
+        self.speed[mask] = speed
+
+    def step(self, dt: float, actions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Advances every game that is in play by ``dt`` seconds.
+
+        ``actions`` has shape (n_games, 2) with -1 (up), 0 or 1 (down) for the left and
+        right paddle. Returns a boolean mask of games in which a point was scored; the
+        scorer is recorded in ``latest_winner`` and those games are reset to serve.
+        """
+        cfg = self.config
+        active = ~self.serving
+
+        if actions is not None:
+            movement = np.asarray(actions, dtype=np.float64) * (self.speed * dt)[:, None]
+            new_y = np.clip(self.paddle_y + movement, 0, cfg.height - cfg.paddle_height)
+            np.copyto(self.paddle_y, new_y, where=active[:, None])
+
+        self._move_ball(dt * active)
+        x = self.ball_pos[:, 0]
+
+        right_scored = active & (x < 0)
+        left_scored = active & ~right_scored & (x > cfg.width)
+        scored = right_scored | left_scored
+        if scored.any():
+            self.scores[right_scored, RIGHT] += 1
+            self.scores[left_scored, LEFT] += 1
+            self.latest_winner[right_scored] = RIGHT
+            self.latest_winner[left_scored] = LEFT
+            self.reset_positions(scored)
+            if self.auto_serve:
+                self.serve(scored)
+        return scored
+
+    def _move_ball(self, dt: np.ndarray):
+        """Moves every ball by its own ``dt``, bouncing off walls and paddles along the way.
+
+        Each iteration finds the earliest wall or paddle contact within the time left,
+        moves the ball there and reflects it. Paddles are swept as rects grown by the
+        ball radius, and only entered faces count, so a ball that is already overlapping
+        a paddle moves out of it instead of bouncing back and forth. Only the balls with
+        time left take part in an iteration, after the first that's the few that bounced.
+        """
+        cfg = self.config
+        r = cfg.ball_radius
+        x_lo = self.paddle_x - r
+        x_hi = self.paddle_x + cfg.paddle_width + r
+        rows = np.flatnonzero(dt > 0)
+        remaining = dt[rows].astype(np.float64)
+
+        for _ in range(MAX_BOUNCES):
+            if not len(rows):
+                return
+            pos = self.ball_pos[rows]
+            vel = self.ball_vel[rows]
+            x, y = pos[:, 0], pos[:, 1]
+            vx, vy = vel[:, 0], vel[:, 1]
+            paddle_y = self.paddle_y[rows]
+            y_lo = paddle_y - r
+            y_hi = paddle_y + cfg.paddle_height + r
+
+            wall_y = np.where(vy < 0, r, cfg.height - r)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t_wall = np.where(vy != 0, np.maximum((wall_y - y) / vy, 0), np.inf)
+
+            near_x, far_x = _slab(x_lo, x_hi, x[:, None], vx[:, None])
+            near_y, far_y = _slab(y_lo, y_hi, y[:, None], vy[:, None])
+            entry = np.maximum(near_x, near_y)
+            hits = (entry >= 0) & (entry <= np.minimum(far_x, far_y))
+            t_paddles = np.where(hits, entry, np.inf)
+            side = t_paddles.argmin(axis=1)
+            each = np.arange(len(rows))
+            t_paddle = t_paddles[each, side]
+            x_face = near_x[each, side] >= near_y[each, side]
+
+            t_event = np.minimum(t_wall, t_paddle)
+            event = t_event <= remaining
+            t = np.where(event, t_event, remaining)
+            self.ball_pos[rows] = pos + vel * t[:, None]
+
+            paddle_event = event & (t_paddle <= t_wall)
+            vx[paddle_event & x_face] *= -1
+            vy[(paddle_event & ~x_face) | (event & ~paddle_event)] *= -1
+            self.ball_vel[rows] = vel
+            rows, remaining = rows[event], remaining[event] - t[event]
+            keep = remaining > 0
+            rows, remaining = rows[keep], remaining[keep]
+
+        self.ball_pos[rows] += self.ball_vel[rows] * remaining[:, None]
@@ -0,0 +1,54 @@
+import argparse
+import numpy as np
+from pong.cpu import DIFFICULTIES, CpuController
+from pong.simulation import FIXED_DT, LEFT, RIGHT, PongSimulation
+from utils import tournament
+
+
+def play_batch(first: str, second: str, seeds: list[int], points: int = 5, max_seconds: float = 300) -> list[float]:
+    """Plays one headless match per seed, ``first`` on the left, all of them in a single simulation.
+
+    A match goes to whoever reaches ``points`` first; matches still running after
+    ``max_seconds`` of game time go to the leader, or are drawn when level.
+    """
+    n = len(seeds)
+    seq = np.random.SeedSequence(seeds)
+    sim_seed, left_seed, right_seed = seq.spawn(3)
+    sim = PongSimulation(n, auto_serve=True, seed=sim_seed)
+    # alternate who receives the first serve, like switching ends between matches
+    sim.latest_winner[:] = np.asarray(seeds) % 2
+    sim.serving[:] = True
+    sim.serve()
+    left = CpuController(sim, LEFT, DIFFICULTIES[first], left_seed)
+    right = CpuController(sim, RIGHT, DIFFICULTIES[second], right_seed)
+
+    actions = np.zeros((n, 2))
+    result = np.full(n, np.nan)
+    for _ in range(int(max_seconds / FIXED_DT)):
+        actions[:, LEFT] = left.actions(FIXED_DT)
+        actions[:, RIGHT] = right.actions(FIXED_DT)
+        if sim.step(FIXED_DT, actions).any():
+            undecided = np.isnan(result)
+            result[undecided & (sim.scores[:, LEFT] >= points)] = 1
+            result[undecided & (sim.scores[:, RIGHT] >= points)] = 0
+            if not np.isnan(result).any():
+                break
+    undecided = np.isnan(result)
+    lead = np.sign(sim.scores[:, LEFT] - sim.scores[:, RIGHT])
+    result[undecided] = (lead[undecided] + 1) / 2
+    return result.tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round robin between the Pong CPU difficulties")
+    parser.add_argument("--players", nargs="+", choices=DIFFICULTIES, default=list(DIFFICULTIES))
+    parser.add_argument("--rounds", type=int, default=1000, help="matches per ordered pair")
+    parser.add_argument("--batch", type=int, default=250, help="matches simulated together in one worker task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="defaults to all cores")
+    args = parser.parse_args()
+    tournament.run(args.players, play_batch, args.rounds, args.batch, args.seed, args.workers)
+
+
+if __name__ == "__main__":
+    main()
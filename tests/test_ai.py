@@ -0,0 +1,28 @@
+from tic_tac_toe.ai import MinimaxEngine, TranspositionTable
+from tic_tac_toe.board import CLASSIC, BitBoard, Player
+
+
+def test_first_replies_are_lookups():
+    # the reply time itself is measured by the benchmarks, tic_tac_toe.minimax.first_reply
+    for opening in [None, *range(CLASSIC.n_cells)]:
+        engine = MinimaxEngine(CLASSIC, TranspositionTable(CLASSIC))
+        board = BitBoard(CLASSIC)
+        player = Player.X
+        if opening is not None:
+            board.play(opening, Player.X)
+            player = Player.O
+        engine.choose_move(board, player)
+        stats = engine.last_stats
+        empty = CLASSIC.n_cells - (board.x_bits | board.o_bits).bit_count()
+        # one solved entry per move to try, nothing searched below them
+        assert stats.probes and stats.hits == stats.probes, f"after {opening}: {stats}"
+        assert stats.nodes <= empty, f"after {opening}: {stats}"
+
+
+def test_warm_table_still_plays_perfectly():
+    engine = MinimaxEngine(CLASSIC, TranspositionTable(CLASSIC))
+    assert engine.evaluate(BitBoard(CLASSIC), Player.X) == 0
+    # X in a corner, O must take the center or lose
+    board = BitBoard(CLASSIC)
+    board.play(0, Player.X)
+    assert engine.choose_move(board, Player.O) == 4
@@ -0,0 +1,18 @@
+from tic_tac_toe import mcts
+from tic_tac_toe.board import BitBoard, BoardSpec, Player
+from tic_tac_toe.mcts import MctsEngine, candidate_moves
+
+
+def test_falls_back_to_every_empty_cell(monkeypatch):
+    # a neighbourhood of just the stone itself never has an empty cell in it
+    monkeypatch.setattr(mcts, "NEIGHBOURHOOD", 0)
+    mcts.neighbour_masks.cache_clear()
+    try:
+        spec = BoardSpec(5, 5, 4)
+        board = BitBoard(spec)
+        board.play(12, Player.X)
+        assert candidate_moves(spec, board.x_bits, board.o_bits) == [i for i in range(spec.n_cells) if i != 12]
+        engine = MctsEngine(spec, time_budget=0.01, workers=1, seed=0)
+        assert board.is_empty(engine.choose_move(board, Player.O))
+    finally:
+        mcts.neighbour_masks.cache_clear()
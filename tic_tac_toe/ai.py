@@ -0,0 +1,264 @@
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable
+from tic_tac_toe.board import BitBoard, BoardSpec, Player
+
+# entry flags for alpha-beta results: exact value, or only a lower/upper bound on it
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# bitboards are permuted through lookup tables of this many bits at a time
+CHUNK_BITS = 10
+
+# biggest board that full minimax still answers at interactive speed, MCTS takes over above it
+MINIMAX_MAX_CELLS = 12
+
+# boards up to this size get every position solved when the table is first filled, about 30 ms
+# for 3x3; a 12 cell board would take seconds, there only the opening is searched
+SOLVE_ALL_CELLS = 9
+
+
+def symmetry_permutations(spec: BoardSpec) -> list[tuple[int, ...]]:
+    """Cell permutations for every symmetry of the board: 8 for square boards, 4 otherwise."""
+    w, h = spec.cols, spec.rows
+    transforms: list[Callable[[int, int], tuple[int, int]]] = [
+        lambda x, y: (x, y),
+        lambda x, y: (w - 1 - x, y),
+        lambda x, y: (x, h - 1 - y),
+        lambda x, y: (w - 1 - x, h - 1 - y),
+    ]
+    if w == h:
+        transforms += [
+            lambda x, y: (y, x),
+            lambda x, y: (h - 1 - y, x),
+            lambda x, y: (y, w - 1 - x),
+            lambda x, y: (h - 1 - y, w - 1 - x),
+        ]
+    return [tuple(spec.index(*f(*spec.coords(idx))) for idx in range(spec.n_cells)) for f in transforms]
+
+
+class Symmetries:
+    """Maps a position to one key shared by all of its rotations and reflections."""
+
+    def __init__(self, spec: BoardSpec):
+        self.n_cells: int = spec.n_cells
+        self.chunks: list[tuple[int, int]] = [
+            (start, min(CHUNK_BITS, spec.n_cells - start)) for start in range(0, spec.n_cells, CHUNK_BITS)
+        ]
+        # tables[s][c][v] is chunk c holding value v, moved to where symmetry s sends those cells
+        self.tables: list[list[list[int]]] = []
+        for perm in symmetry_permutations(spec):
+            sym_tables = []
+            for start, length in self.chunks:
+                table = []
+                for value in range(1 << length):
+                    table.append(sum(1 << perm[start + i] for i in range(length) if value >> i & 1))
+                sym_tables.append(table)
+            self.tables.append(sym_tables)
+        self._single_chunk = [sym_tables[0] for sym_tables in self.tables] if len(self.chunks) == 1 else None
+
+    def permute(self, bits: int, sym: int) -> int:
+        result = 0
+        for table, (start, length) in zip(self.tables[sym], self.chunks):
+            result |= table[bits >> start & ((1 << length) - 1)]
+        return result
+
+    def canonical(self, me: int, opp: int) -> int:
+        n = self.n_cells
+        if self._single_chunk is not None:
+            return min(t[me] | t[opp] << n for t in self._single_chunk)
+        return min(self.permute(me, s) | self.permute(opp, s) << n for s in range(len(self.tables)))
+
+
+class TranspositionTable:
+    """Search results keyed on canonical positions, meant to outlive a single game.
+
+    Values are stored from the point of view of the side to move, so X and O
+    positions that mirror each other share an entry as well.
+    """
+
+    def __init__(self, spec: BoardSpec):
+        self.spec: BoardSpec = spec
+        self.symmetries: Symmetries = Symmetries(spec)
+        self.entries: dict[int, tuple[int, int]] = {}
+        self.probes: int = 0
+        self.hits: int = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+
+@lru_cache(maxsize=None)
+def shared_table(spec: BoardSpec) -> TranspositionTable:
+    """The process-wide table for ``spec``, so every game after the first is mostly lookups."""
+    return TranspositionTable(spec)
+
+
+@dataclass
+class SearchStats:
+    nodes: int = 0
+    probes: int = 0
+    hits: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.nodes} nodes, {self.hit_rate:.0%} cache hits"
+
+
+class MinimaxEngine:
+    """Perfect play through negamax with alpha-beta pruning and a transposition table.
+
+    Scores are ``empty cells + 1`` for a win (so faster wins score higher), the
+    negation of that for a loss and 0 for a draw.
+    """
+
+    def __init__(self, spec: BoardSpec, table: TranspositionTable | None = None):
+        self.spec: BoardSpec = spec
+        self.table: TranspositionTable = table if table is not None else shared_table(spec)
+        # cells on the most lines first, which is what makes alpha-beta cut early
+        self.move_order: tuple[int, ...] = tuple(
+            sorted(range(spec.n_cells), key=lambda idx: len(spec.cell_masks[idx]), reverse=True)
+        )
+        self.last_stats: SearchStats = SearchStats()
+        if not self.table:
+            self.warm()
+
+    def warm(self):
+        """Fills the table before the first game, so the first replies are lookups like the later ones.
+
+        Small boards get every reachable position solved exactly, from the fullest board
+        back to the empty one, so each search finds its children already solved. Bigger
+        ones get the search from the empty board and after every first move.
+        """
+        if self.spec.n_cells <= SOLVE_ALL_CELLS:
+            n = self.spec.n_cells
+            for me, opp in self._positions():
+                self._negamax(me, opp, -n - 1, n + 1)
+        else:
+            self.choose_move(BitBoard(self.spec), Player.X)
+            for idx in range(self.spec.n_cells):
+                board = BitBoard(self.spec)
+                board.play(idx, Player.X)
+                self.choose_move(board, Player.O)
+        self.last_stats = SearchStats()
+
+    def _positions(self) -> list[tuple[int, int]]:
+        """(side to move, other side) of every reachable unfinished position, one per symmetry class, fullest first."""
+        symmetries = self.table.symmetries
+        seen: set[int] = set()
+        positions: list[tuple[int, int]] = []
+        frontier = [(0, 0)]
+        while frontier:
+            me, opp = frontier.pop()
+            key = symmetries.canonical(me, opp)
+            if key in seen:
+                continue
+            seen.add(key)
+            occupied = me | opp
+            if occupied == self.spec.full:
+                continue
+            positions.append((me, opp))
+            for idx in range(self.spec.n_cells):
+                if not occupied >> idx & 1 and not self._wins(me | 1 << idx, idx):
+                    frontier.append((opp, me | 1 << idx))
+        positions.sort(key=lambda position: (position[0] | position[1]).bit_count(), reverse=True)
+        return positions
+
+    def _wins(self, bits: int, idx: int) -> bool:
+        for mask in self.spec.cell_masks[idx]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def _negamax(self, me: int, opp: int, alpha: int, beta: int) -> int:
+        stats = self.last_stats
+        stats.nodes += 1
+        occupied = me | opp
+        if occupied == self.spec.full:
+            return 0
+
+        table = self.table
+        key = table.symmetries.canonical(me, opp)
+        stats.probes += 1
+        entry = table.entries.get(key)
+        if entry is not None:
+            stats.hits += 1
+            value, flag = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        alpha_orig = alpha
+        empty = self.spec.n_cells - occupied.bit_count()
+        best = -empty - 1
+        for idx in self.move_order:
+            if occupied >> idx & 1:
+                continue
+            new_me = me | 1 << idx
+            if self._wins(new_me, idx):
+                score = empty
+            else:
+                score = -self._negamax(opp, new_me, -beta, -alpha)
+            if score > best:
+                best = score
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        table.entries[key] = (best, flag)
+        return best
+
+    def evaluate(self, board: BitBoard, player: Player) -> int:
+        """Game-theoretic score of ``board`` for ``player``, who is to move."""
+        opponent = Player(-player.value)
+        return self._negamax(board.bits(player), board.bits(opponent), -self.spec.n_cells - 1, self.spec.n_cells + 1)
+
+    def choose_move(self, board: BitBoard, player: Player) -> int:
+        """Returns the best cell index for ``player`` to play on ``board``."""
+        start = time.perf_counter()
+        self.last_stats = stats = SearchStats()
+
+        me = board.bits(player)
+        opp = board.bits(Player(-player.value))
+        occupied = me | opp
+        empty = self.spec.n_cells - occupied.bit_count()
+        alpha, beta = -empty - 1, empty + 1
+        best_move = -1
+        for idx in self.move_order:
+            if occupied >> idx & 1:
+                continue
+            new_me = me | 1 << idx
+            if self._wins(new_me, idx):
+                best_move = idx
+                break
+            score = -self._negamax(opp, new_me, -beta, -alpha)
+            if score > alpha or best_move < 0:
+                alpha = max(alpha, score)
+                best_move = idx
+
+        self.table.probes += stats.probes
+        self.table.hits += stats.hits
+        stats.elapsed = time.perf_counter() - start
+        return best_move
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from enum import Enum
+from functools import cached_property
+
+
+class Player(Enum):
+    X = 1
+    O = -1
+
+
+# the four line directions as (dx, dy): horizontal, vertical, diagonal, anti-diagonal
+DIRECTIONS: tuple[tuple[int, int], ...] = ((1, 0), (0, 1), (1, 1), (-1, 1))
+
+
+@dataclass(frozen=True)
+class BoardSpec:
+    """An m,n,k game: a ``rows`` x ``cols`` board won by ``k`` in a row.
+
+    Cells are numbered ``y * cols + x``. The line tables are built once per spec and
+    shared by every board using it.
+    """
+
+    rows: int = 3
+    cols: int = 3
+    k: int = 3
+
+    def __post_init__(self):
+        if self.rows < 1 or self.cols < 1:
+            raise ValueError(f"Board must have at least one cell, got {self.rows}x{self.cols}")
+        if not 1 <= self.k <= max(self.rows, self.cols):
+            raise ValueError(f"Win length {self.k} doesn't fit on a {self.rows}x{self.cols} board")
+
+    @cached_property
+    def n_cells(self) -> int:
+        return self.rows * self.cols
+
+    @cached_property
+    def full(self) -> int:
+        return (1 << self.n_cells) - 1
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.cols + x
+
+    def coords(self, idx: int) -> tuple[int, int]:
+        y, x = divmod(idx, self.cols)
+        return x, y
+
+    @cached_property
+    def lines(self) -> tuple[tuple[int, ...], ...]:
+        """Every run of ``k`` cells that wins the game, as cell indices."""
+        lines = []
+        for dx, dy in DIRECTIONS:
+            for y in range(self.rows):
+                for x in range(self.cols):
+                    end_x = x + dx * (self.k - 1)
+                    end_y = y + dy * (self.k - 1)
+                    if 0 <= end_x < self.cols and end_y < self.rows:
+                        lines.append(tuple(self.index(x + dx * i, y + dy * i) for i in range(self.k)))
+        return tuple(lines)
+
+    @cached_property
+    def win_masks(self) -> tuple[int, ...]:
+        return tuple(sum(1 << i for i in line) for line in self.lines)
+
+    @cached_property
+    def cell_masks(self) -> tuple[tuple[int, ...], ...]:
+        """For each cell, only the win masks of the lines running through it."""
+        per_cell: list[list[int]] = [[] for _ in range(self.n_cells)]
+        for line, mask in zip(self.lines, self.win_masks):
+            for idx in line:
+                per_cell[idx].append(mask)
+        return tuple(tuple(masks) for masks in per_cell)
+
+
+CLASSIC = BoardSpec()
+
+
+class BitBoard:
+    """An m,n,k position stored as one integer bitboard per player.
+
+    Bit ``spec.index(x, y)`` is set in ``x_bits``/``o_bits`` when that player owns the
+    cell. ``play`` only tests the lines through the new stone (at most 4k of them),
+    so the winner is tracked incrementally instead of rescanning the board.
+    """
+
+    __slots__ = ("spec", "x_bits", "o_bits", "winner")
+
+    def __init__(self, spec: BoardSpec = CLASSIC):
+        self.spec: BoardSpec = spec
+        self.x_bits: int = 0
+        self.o_bits: int = 0
+        self.winner: Player | None = None
+
+    def clear(self):
+        self.x_bits = 0
+        self.o_bits = 0
+        self.winner = None
+
+    def bits(self, player: Player) -> int:
+        return self.x_bits if player == Player.X else self.o_bits
+
+    def is_empty(self, idx: int) -> bool:
+        return not (self.x_bits | self.o_bits) >> idx & 1
+
+    def is_full(self) -> bool:
+        return self.x_bits | self.o_bits == self.spec.full
+
+    def play(self, idx: int, player: Player) -> bool:
+        """Places ``player`` on cell ``idx``, returns True if that move wins the game."""
+        bit = 1 << idx
+        if player == Player.X:
+            self.x_bits |= bit
+            bits = self.x_bits
+        else:
+            self.o_bits |= bit
+            bits = self.o_bits
+
+        for mask in self.spec.cell_masks[idx]:
+            if bits & mask == mask:
+                self.winner = player
+                return True
+        return False
+
+    def has_won(self, player: Player) -> bool:
+        bits = self.bits(player)
+        return any(bits & mask == mask for mask in self.spec.win_masks)
@@ -0,0 +1,74 @@
+import numpy as np
+from tic_tac_toe.board import CLASSIC, BoardSpec, Player
+from tic_tac_toe.playouts import cell_line_array
+
+
+class TicTacToeEnv:
+    """``batch_size`` independent games stepped together, for self-play and training.
+
+    Boards use the same encoding as ``TicTacToe.grid`` (1 for X, -1 for O, 0 for empty)
+    in one int8 array of shape (batch_size, rows, cols). Actions are flat cell indices
+    ``y * cols + x``. Like ``handle_click``, a move on an occupied cell does nothing and
+    the same player stays to move. Finished games are reset automatically.
+    """
+
+    def __init__(self, batch_size: int, spec: BoardSpec = CLASSIC, seed: int | None = None):
+        self.batch_size: int = batch_size
+        self.spec: BoardSpec = spec
+        self.rng = np.random.default_rng(seed)
+        # one extra always empty cell at the end, the padding target of cell_line_array
+        self._cells = np.zeros((batch_size, spec.n_cells + 1), dtype=np.int8)
+        self.boards: np.ndarray = self._cells[:, : spec.n_cells].reshape(batch_size, spec.rows, spec.cols)
+        self.to_move: np.ndarray = np.full(batch_size, Player.X.value, dtype=np.int8)
+        self._rows = np.arange(batch_size)
+        self._cell_lines = cell_line_array(spec)
+
+    def reset(self, mask: np.ndarray | None = None) -> np.ndarray:
+        """Clears the masked games (all of them by default), returns the live ``boards`` array."""
+        if mask is None:
+            self._cells[:] = 0
+            self.to_move[:] = Player.X.value
+        else:
+            self._cells[mask] = 0
+            self.to_move[mask] = Player.X.value
+        return self.boards
+
+    def legal_moves(self) -> np.ndarray:
+        """Boolean mask of shape (batch_size, n_cells), True where a move can be played."""
+        return self._cells[:, : self.spec.n_cells] == 0
+
+    def sample_legal(self) -> np.ndarray:
+        """A uniformly random legal move for every game."""
+        keys = self.rng.random((self.batch_size, self.spec.n_cells))
+        return np.where(self.legal_moves(), keys, -1.0).argmax(axis=1)
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+        """Plays one move in every game.
+
+        Returns ``(boards, rewards, dones, info)``. ``rewards`` are for the player who just
+        moved: 1 for a win, 0 otherwise. ``info`` holds the ``winner`` of each finished game
+        (1, -1, or 0 for a draw), the ``illegal`` move mask and ``final_boards``, the
+        finished games' boards from before the automatic reset.
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        rows = self._rows
+        player = self.to_move.copy()
+
+        legal = self._cells[rows, actions] == 0
+        self._cells[rows[legal], actions[legal]] = player[legal]
+
+        # only the lines through the new stone can have been completed
+        line_sums = self._cells[rows[:, None, None], self._cell_lines[actions]].sum(axis=2, dtype=np.int16)
+        won = legal & (line_sums == self.spec.k * player[:, None]).any(axis=1)
+        full = (self._cells[:, : self.spec.n_cells] != 0).all(axis=1)
+        drawn = legal & ~won & full
+        dones = won | drawn
+
+        winner = np.where(won, player, 0).astype(np.int8)
+        rewards = won.astype(np.float32)
+        info = {"winner": winner, "illegal": ~legal, "final_boards": self.boards[dones].copy()}
+
+        self.to_move[legal] = -player[legal]
+        if dones.any():
+            self.reset(dones)
+        return self.boards, rewards, dones, info
@@ -1,14 +1,22 @@
+import argparse
+import time
 import pygame
 import numpy as np
 from dataclasses import dataclass
-from enum import Enum
+from typing import TYPE_CHECKING
 from utils.logging import Log
-from utils.display import render_centered_text_lines
+from utils.animation import Animator, ease_out_back
+from utils.display import DirtyRects, render_text_lines, text_cache
+from utils.loop import Scheduler
+from utils.profiling import FrameProfiler
+from utils.sprites import Blend, Shape, SpriteAtlas
+from tic_tac_toe.board import BitBoard, BoardSpec, Player
 
-
-class Player(Enum):
-    X = 1
-    O = -1
+if TYPE_CHECKING:
+    # the engines are imported when a game against the computer starts, MCTS brings multiprocessing along
+    from tic_tac_toe.ai import MinimaxEngine
+    from tic_tac_toe.mcts import MctsEngine
+    from tic_tac_toe.tablebase import Tablebase
 
 
 @dataclass
@@ -18,154 +26,249 @@ class Point:
 
 
 class TicTacToe:
-    def __init__(self):
-        # pixels on screen
+    def __init__(
+        self,
+        rows: int = 3,
+        cols: int = 3,
+        k: int = 3,
+        ai_player: Player | None = None,
+        ai_budget: float = 0.1,
+        ai_workers: int | None = None,
+    ):
+        self.spec: BoardSpec = BoardSpec(rows, cols, k)
+
+        # pixels on screen, the longer side of the board is always 720px
         self.px: int = 720
-        self.px_unit: int = self.px // 6
-        self.line_width: int = 8
-        self.screen = pygame.display.set_mode((self.px, self.px))
-        self.screen.fill("gray")
+        self.cell_px: int = self.px // max(rows, cols)
+        self.px_unit: int = self.cell_px // 2
+        self.px_width: int = self.cell_px * cols
+        self.px_height: int = self.cell_px * rows
+        self.line_width: int = max(2, 24 // max(rows, cols))
+        self.screen = pygame.display.set_mode((self.px_width, self.px_height))
+        self.sprites = SpriteAtlas(self.define_sprites)
         self._render_gridlines()
+        # nothing is ever erased, the board only changes where a piece or message gets drawn
+        self.dirty = DirtyRects(self.screen, "gray")
+        self.scheduler = Scheduler()
+        self.animator = Animator()
 
-        self.grid: np.ndarray[int] = np.array([[0 for _ in range(3)] for _ in range(3)])
+        self.grid: np.ndarray[int] = np.zeros((rows, cols), dtype=int)
+        self.board: BitBoard = BitBoard(self.spec)
         self.active_player: Player = Player.X
 
+        # single player mode, prefers a generated tablebase, then minimax with a transposition
+        # table shared across restarts, and MCTS within ``ai_budget`` seconds on big boards
+        self.ai_player: Player | None = ai_player
+        self.ai_budget: float = ai_budget
+        self.ai_workers: int | None = ai_workers
+        self.engine: "Tablebase | MinimaxEngine | MctsEngine | None" = None
+        if ai_player:
+            from tic_tac_toe.ai import MINIMAX_MAX_CELLS, MinimaxEngine
+            from tic_tac_toe.mcts import MctsEngine
+            from tic_tac_toe.tablebase import load_tablebase
+
+            self.engine = load_tablebase(self.spec)
+            if self.engine is None and self.spec.n_cells <= MINIMAX_MAX_CELLS:
+                self.engine = MinimaxEngine(self.spec)
+            elif self.engine is None:
+                self.engine = MctsEngine(self.spec, time_budget=ai_budget, workers=ai_workers)
+
         self.running: bool = True
         self._finished: bool = False  # checks if a winner has been found or not
 
+        if self.ai_player == self.active_player:
+            self.scheduler.call_later(0, self.play_ai_move)
+
     def __enter__(self):
         pygame.init()
-        self.font = pygame.font.Font(pygame.font.get_default_font(), 36)
+        self.font = text_cache.font(36)
+        # only paces frames while something animates, an idle board still sleeps in the scheduler
+        self.clock = pygame.time.Clock()
+        self.profiler = FrameProfiler()
         pygame.display.set_caption("Tic Tac Toe")
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
+        text_cache.clear()
         pygame.quit()
 
+    def define_sprites(self, window_size: tuple[int, int]) -> dict[str, Shape]:
+        return {
+            "board": Shape(window_size, self._paint_board, Blend.OPAQUE),
+            Player.X: Shape((self.cell_px, self.cell_px), self._paint_X),
+            Player.O: Shape((self.cell_px, self.cell_px), self._paint_O),
+        }
+
+    def _paint_board(self, surface: pygame.Surface):
+        surface.fill("gray")
+        width, height = surface.get_size()
+        for i in range(1, self.spec.cols):
+            px = self.cell_px * i
+            pygame.draw.line(surface, "black", start_pos=(px, 0), end_pos=(px, height), width=self.line_width)
+        for i in range(1, self.spec.rows):
+            px = self.cell_px * i
+            pygame.draw.line(surface, "black", start_pos=(0, px), end_pos=(width, px), width=self.line_width)
+
+    def _paint_O(self, surface: pygame.Surface):
+        center = (self.px_unit, self.px_unit)
+        pygame.draw.circle(surface, "white", center, int(self.px_unit * 0.9), self.line_width)
+
+    def _paint_X(self, surface: pygame.Surface):
+        # need to normalize the size to scale
+        size_scalar = 0.85
+        low = self.px_unit - int(self.px_unit * size_scalar)
+        high = self.px_unit + int(self.px_unit * size_scalar)
+        pygame.draw.line(surface, "white", start_pos=(low, low), end_pos=(high, high), width=self.line_width)
+        pygame.draw.line(surface, "white", start_pos=(low, high), end_pos=(high, low), width=self.line_width)
+
     def _render_gridlines(self):
-        for i in range(1, 3):
-            px = self.px_unit * 2 * i
-
-            pygame.draw.line(
-                self.screen,
-                "black",
-                start_pos=(px, 0),
-                end_pos=(px, self.px),
-                width=self.line_width,
-            )
-            pygame.draw.line(
-                self.screen,
-                "black",
-                start_pos=(0, px),
-                end_pos=(self.px, px),
-                width=self.line_width,
-            )
+        # the empty board, gridlines included, is a single pre-rendered sprite
+        self.sprites.blit(self.screen, "board", (0, 0))
 
     def main(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                self.handle_click()
-            if self._finished and (event.type == pygame.KEYDOWN) and (event.key == pygame.K_r):
-                Log.info("Triggered restart callback")
-                self.restart()
-
-        # flip() the display to put your work on screen
-        pygame.display.flip()
-
-    def handle_click(self):
-        if self._finished:
+        profiler = self.profiler
+        # sleeps until something happens, pending AI moves run from here as timers
+        with profiler.phase(FrameProfiler.IDLE):
+            if self.animator.active:
+                self.clock.tick(60)
+            events = self.scheduler.wait(busy=self.animator.active)
+        profiler.begin_frame()
+        Log.next_frame()
+        # the board is never repainted, so the HUD restores what it covered before anything draws
+        self.dirty.add(profiler.erase_hud(self.screen))
+        self.dirty.rects(self.animator.erase(self.screen))
+
+        with profiler.phase("timers"):
+            self.scheduler.run_timers()
+        with profiler.phase("events"):
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.running = False
+                elif event.type == pygame.WINDOWEXPOSED:
+                    self.dirty.invalidate()
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    self.handle_click(event.pos)
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle_hud()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    profiler.export_default()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                    Log.dump_events(time.strftime("events-%Y%m%d-%H%M%S.jsonl"))
+                if self._finished and (event.type == pygame.KEYDOWN) and (event.key == pygame.K_r):
+                    Log.info("Triggered restart callback")
+                    self.reset()
+
+        self.dirty.rects(self.animator.draw(self.screen))
+        self.dirty.add(profiler.draw_hud(self.screen, text_cache.font(20)))
+        # push whatever changed to the screen, a no-op while the board sits idle
+        with profiler.phase("present"):
+            self.dirty.present()
+        profiler.end_frame()
+
+    def handle_click(self, click: tuple[int, int]):
+        if self._finished or self.active_player == self.ai_player:
             return
-        pos: Point = Point(*pygame.mouse.get_pos())
+        # where the button went down, the pointer may have moved on by the time the event is handled
+        pos: Point = Point(*click)
         grid_x, grid_y = self.coords_to_grid_idx(pos)
-        Log.info("Found (%s,%s)", grid_x, grid_y)
+        Log.debug("Found (%s,%s)", grid_x, grid_y)
         if self.grid[grid_y][grid_x]:
-            Log.info("Cell already occupied, nothing done")
+            Log.debug("Cell already occupied, nothing done")
             return
 
-        # clicked, see whose turn it is
+        self.place(grid_x, grid_y)
+        if not self._finished and self.active_player == self.ai_player:
+            # reply on the next loop iteration, so the human's move is on screen first
+            self.scheduler.call_later(0, self.play_ai_move)
+
+    def place(self, grid_x: int, grid_y: int):
+        # see whose turn it is
         self.grid[grid_y][grid_x] = self.active_player.value
+        self.board.play(self.spec.index(grid_x, grid_y), self.active_player)
+        Log.event("move", player=self.active_player.name, x=grid_x, y=grid_y)
         if self.active_player == Player.O:
             self.render_O(grid_x, grid_y)
         else:
             self.render_X(grid_x, grid_y)
 
         if winner := self.check_any_win():
-            render_centered_text_lines(self.screen, [f"{winner.name} wins!", "Press R to restart"], self.font, "black")
-            self._finished = True
+            self.show_banner([f"{winner.name} wins!", "Press R to restart"])
             return
-        elif not np.any(self.grid == 0):
-            render_centered_text_lines(self.screen, ["It's a tie!", "Press R to restart"], self.font, "black")
-            self._finished = True
+        elif self.board.is_full():
+            self.show_banner(["It's a tie!", "Press R to restart"])
             return
         self.swap_players()
 
+    def show_banner(self, lines: list[str]):
+        """Ends the game with ``lines`` popping in over the board."""
+        self._finished = True
+        banner = render_text_lines(lines, self.font, "black")
+        center = (self.px_width / 2, self.px_height / 2)
+        # the board under the banner is never redrawn, so the animator restores it between frames
+        self.animator.add(banner, 0.4, center, alpha=(0, 255), scale=(0.5, 1), easing=ease_out_back, restore=True)
+
+    def play_ai_move(self):
+        start = time.perf_counter()
+        idx = self.engine.choose_move(self.board, self.active_player)
+        self.place(*self.spec.coords(idx))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        Log.info("AI replied in %.3f ms (%s)", elapsed_ms, self.engine.last_stats)
+        Log.event("ai_move", ms=elapsed_ms)
+
     def render_O(self, x: int, y: int):
-        pygame.draw.circle(
-            self.screen,
-            "white",
-            self.grid_idx_to_center(x, y),
-            int(self.px_unit * 0.9),
-            self.line_width,
-        )
+        self.dirty.add(self.sprites.blit(self.screen, Player.O, (self.cell_px * x, self.cell_px * y)))
 
     def render_X(self, x: int, y: int):
-        center_x, center_y = self.grid_idx_to_center(x, y)
-
-        # need to normalize the size to scale
-        size_scalar = 0.85
-        offset: int = int(self.px_unit * size_scalar)
-
-        pygame.draw.line(
-            self.screen,
-            "white",
-            start_pos=(center_x - offset, center_y - offset),
-            end_pos=(center_x + offset, center_y + offset),
-            width=self.line_width,
-        )
-
-        pygame.draw.line(
-            self.screen,
-            "white",
-            start_pos=(center_x - offset, center_y + offset),
-            end_pos=(center_x + offset, center_y - offset),
-            width=self.line_width,
-        )
+        self.dirty.add(self.sprites.blit(self.screen, Player.X, (self.cell_px * x, self.cell_px * y)))
 
     def grid_idx_to_center(self, x: int, y: int) -> tuple[int, int]:
-        x_center: int = self.px_unit * (2 * x + 1)
-        y_center: int = self.px_unit * (2 * y + 1)
+        x_center: int = self.cell_px * x + self.px_unit
+        y_center: int = self.cell_px * y + self.px_unit
         return (x_center, y_center)
 
     def coords_to_grid_idx(self, p: Point) -> tuple[int, int]:
-        return (int(p.x // (self.px / 3)), int(p.y // (self.px / 3)))
-
-    def restart(self):
-        self.__init__()
+        grid_x = min(int(p.x // self.cell_px), self.spec.cols - 1)
+        grid_y = min(int(p.y // self.cell_px), self.spec.rows - 1)
+        return (grid_x, grid_y)
+
+    def reset(self):
+        """Starts a new game on the same window, engine and scheduler."""
+        self.grid.fill(0)
+        self.board.clear()
+        self.active_player = Player.X
+        self._finished = False
+        self.animator.clear()
+        self._render_gridlines()
+        self.dirty.invalidate()
+        if self.ai_player == self.active_player:
+            self.scheduler.call_later(0, self.play_ai_move)
 
     def swap_players(self):
         self.active_player = Player(-self.active_player.value)
 
     def check_win(self, player: Player) -> bool:
-        win_con = player.value * 3
-        win_con_row: bool = np.any(np.sum(self.grid, axis=0) == win_con)
-        win_con_col: bool = np.any(np.sum(self.grid, axis=1) == win_con)
-        win_con_diag: bool = np.any((np.trace(self.grid) == win_con) | (np.trace(np.fliplr(self.grid)) == win_con))
-        return win_con_row or win_con_col or win_con_diag
+        return self.board.has_won(player)
 
     def check_any_win(self) -> Player | None:
-        if self.check_win(Player.X):
-            Log.info("X wins")
-            return Player.X
-        elif self.check_win(Player.O):
-            Log.info("O wins")
-            return Player.O
-        return None
+        # the board records the winner as moves are played, no need to rescan it
+        if winner := self.board.winner:
+            Log.info("%s wins", winner.name)
+        return winner
 
 
 def main():
-    with TicTacToe() as game:
+    parser = argparse.ArgumentParser(description="Tic Tac Toe on an m x n board, k in a row wins")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("-k", type=int, default=3, help="stones in a row needed to win")
+    parser.add_argument("--ai", choices=[p.name for p in Player], help="let the computer play this side")
+    parser.add_argument("--ai-budget", type=float, default=100, help="milliseconds per move on big boards")
+    parser.add_argument("--ai-workers", type=int, help="processes searching on big boards, defaults to all cores")
+    args = parser.parse_args()
+
+    ai_player = Player[args.ai] if args.ai else None
+    Log.record_events()
+    with TicTacToe(args.rows, args.cols, args.k, ai_player, args.ai_budget / 1000, args.ai_workers) as game:
         while game.running:
             game.main()
 
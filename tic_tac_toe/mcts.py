@@ -0,0 +1,233 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+from tic_tac_toe.board import BitBoard, BoardSpec, Player
+from tic_tac_toe.playouts import cells_from_bits, random_playouts
+
+# candidate moves are the empty cells within this many cells of a stone
+NEIGHBOURHOOD = 2
+
+
+@lru_cache(maxsize=None)
+def neighbour_masks(spec: BoardSpec) -> tuple[int, ...]:
+    masks = []
+    for idx in range(spec.n_cells):
+        x, y = spec.coords(idx)
+        mask = 0
+        for ny in range(max(0, y - NEIGHBOURHOOD), min(spec.rows, y + NEIGHBOURHOOD + 1)):
+            for nx in range(max(0, x - NEIGHBOURHOOD), min(spec.cols, x + NEIGHBOURHOOD + 1)):
+                mask |= 1 << spec.index(nx, ny)
+        masks.append(mask)
+    return tuple(masks)
+
+
+def set_bits(bits: int) -> list[int]:
+    indices = []
+    while bits:
+        low = bits & -bits
+        indices.append(low.bit_length() - 1)
+        bits ^= low
+    return indices
+
+
+def candidate_moves(spec: BoardSpec, x_bits: int, o_bits: int) -> list[int]:
+    """Empty cells near existing stones; on big boards the far away cells are never worth searching.
+
+    Every empty cell once the neighbourhood has none left, so a board that isn't full
+    always has a move to search.
+    """
+    occupied = x_bits | o_bits
+    if not occupied:
+        return [spec.index(spec.cols // 2, spec.rows // 2)]
+    masks = neighbour_masks(spec)
+    near = 0
+    for idx in set_bits(occupied):
+        near |= masks[idx]
+    return set_bits(near & ~occupied) or set_bits(spec.full & ~occupied)
+
+
+def wins(spec: BoardSpec, bits: int, idx: int) -> bool:
+    for mask in spec.cell_masks[idx]:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+class Node:
+    __slots__ = ("move", "parent", "mover", "terminal", "untried", "children", "visits", "wins")
+
+    def __init__(self, move: int, parent: "Node | None", mover: int, terminal: int | None, untried: list[int]):
+        self.move: int = move
+        self.parent: Node | None = parent
+        # the player (1 or -1) whose move led here, ``wins`` are counted for them
+        self.mover: int = mover
+        # winner (1, -1, or 0 for a draw) if the game is over at this node
+        self.terminal: int | None = terminal
+        self.untried: list[int] = untried
+        self.children: list[Node] = []
+        self.visits: int = 0
+        self.wins: float = 0.0
+
+
+def search_tree(
+    spec: BoardSpec,
+    x_bits: int,
+    o_bits: int,
+    to_move: int,
+    budget: float,
+    batch: int,
+    exploration: float,
+    seed: int | None,
+) -> tuple[dict[int, tuple[int, float]], int, int]:
+    """Runs UCT for ``budget`` seconds, evaluating each new leaf with ``batch`` playouts at once.
+
+    Returns the root's children as {move: (visits, wins)}, the number of playouts and
+    the number of tree nodes. Module level so it can run in a worker process.
+    """
+    deadline = time.perf_counter() + budget
+    rng = np.random.default_rng(seed)
+    root = Node(-1, None, -to_move, None, candidate_moves(spec, x_bits, o_bits))
+    playouts = 0
+    nodes = 1
+
+    while True:
+        node = root
+        x, o = x_bits, o_bits
+
+        # selection
+        while not node.untried and node.children and node.terminal is None:
+            log_visits = math.log(node.visits)
+            node = max(
+                node.children,
+                key=lambda c: c.wins / c.visits + exploration * math.sqrt(log_visits / c.visits),
+            )
+            if node.mover == 1:
+                x |= 1 << node.move
+            else:
+                o |= 1 << node.move
+
+        # expansion
+        if node.untried and node.terminal is None:
+            move = node.untried.pop(rng.integers(len(node.untried)))
+            mover = -node.mover
+            if mover == 1:
+                x |= 1 << move
+                terminal = 1 if wins(spec, x, move) else None
+            else:
+                o |= 1 << move
+                terminal = -1 if wins(spec, o, move) else None
+            if terminal is None and x | o == spec.full:
+                terminal = 0
+            child = Node(move, node, mover, terminal, [] if terminal is not None else candidate_moves(spec, x, o))
+            node.children.append(child)
+            node = child
+            nodes += 1
+
+        # simulation, scored for the player who moved into the leaf
+        if node.terminal is not None:
+            leaf_wins = batch if node.terminal == node.mover else batch / 2 if node.terminal == 0 else 0
+        else:
+            results = random_playouts(spec, cells_from_bits(spec, x, o), -node.mover, batch, rng)
+            leaf_wins = np.count_nonzero(results == node.mover) + np.count_nonzero(results == 0) / 2
+        playouts += batch
+
+        # backpropagation
+        leaf_mover = node.mover
+        while node is not None:
+            node.visits += batch
+            node.wins += leaf_wins if node.mover == leaf_mover else batch - leaf_wins
+            node = node.parent
+
+        if time.perf_counter() >= deadline:
+            break
+
+    return {child.move: (child.visits, child.wins) for child in root.children}, playouts, nodes
+
+
+@lru_cache(maxsize=None)
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """One long lived pool per size, shared by every engine so restarts don't respawn workers."""
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+@dataclass
+class MctsStats:
+    playouts: int = 0
+    nodes: int = 0
+    elapsed: float = 0.0
+    workers: int = 1
+
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.playouts} playouts at {self.playouts_per_second:,.0f}/s, "
+            f"{self.nodes} tree nodes over {self.workers} worker(s)"
+        )
+
+
+class MctsEngine:
+    """Monte Carlo tree search for boards too big to solve.
+
+    Each tree runs UCT and scores new leaves with a batch of vectorized random playouts.
+    With more than one worker, independent trees grow in a process pool for the whole
+    time budget and their root statistics are summed (root parallelization).
+    """
+
+    def __init__(
+        self,
+        spec: BoardSpec,
+        time_budget: float = 0.1,
+        workers: int | None = None,
+        batch: int = 64,
+        exploration: float = 1.4,
+        seed: int | None = None,
+    ):
+        self.spec: BoardSpec = spec
+        self.time_budget: float = time_budget
+        self.workers: int = workers or os.cpu_count() or 1
+        self.batch: int = batch
+        self.exploration: float = exploration
+        self.seeds = np.random.SeedSequence(seed)
+        self.last_stats: MctsStats = MctsStats()
+
+    def _forced_move(self, x_bits: int, o_bits: int, player: Player) -> int | None:
+        """A move that wins on the spot, or else one that stops the opponent from doing so."""
+        me, opp = (x_bits, o_bits) if player == Player.X else (o_bits, x_bits)
+        empty = set_bits(self.spec.full & ~(x_bits | o_bits))
+        for bits in (me, opp):
+            for idx in empty:
+                if wins(self.spec, bits | 1 << idx, idx):
+                    return idx
+        return None
+
+    def choose_move(self, board: BitBoard, player: Player) -> int:
+        start = time.perf_counter()
+        self.last_stats = stats = MctsStats(workers=self.workers)
+        forced = self._forced_move(board.x_bits, board.o_bits, player)
+        if forced is not None:
+            stats.elapsed = time.perf_counter() - start
+            return forced
+
+        seeds = [s.generate_state(1)[0] for s in self.seeds.spawn(self.workers)]
+        args = (self.spec, board.x_bits, board.o_bits, player.value, self.time_budget, self.batch, self.exploration)
+        if self.workers == 1:
+            results = [search_tree(*args, seeds[0])]
+        else:
+            pool = process_pool(self.workers)
+            results = [future.result() for future in [pool.submit(search_tree, *args, seed) for seed in seeds]]
+
+        visits: dict[int, int] = {}
+        for children, playouts, nodes in results:
+            stats.playouts += playouts
+            stats.nodes += nodes
+            for move, (n, _) in children.items():
+                visits[move] = visits.get(move, 0) + n
+        stats.elapsed = time.perf_counter() - start
+        return max(visits, key=visits.get)
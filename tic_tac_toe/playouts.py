@@ -0,0 +1,54 @@
+import numpy as np
+from functools import lru_cache
+from tic_tac_toe.board import BoardSpec
+
+
+@lru_cache(maxsize=None)
+def line_array(spec: BoardSpec) -> np.ndarray:
+    """``spec.lines`` as an (n_lines, k) index array, for gathering whole lines at once."""
+    return np.array(spec.lines, dtype=np.intp).reshape(-1, spec.k)
+
+
+def cells_from_bits(spec: BoardSpec, x_bits: int, o_bits: int) -> np.ndarray:
+    """Flat int8 board with the grid's encoding: 1 for X, -1 for O, 0 for empty."""
+    n_bytes = (spec.n_cells + 7) // 8
+    x = np.unpackbits(np.frombuffer(x_bits.to_bytes(n_bytes, "little"), np.uint8), bitorder="little")
+    o = np.unpackbits(np.frombuffer(o_bits.to_bytes(n_bytes, "little"), np.uint8), bitorder="little")
+    return (x[: spec.n_cells].astype(np.int8) - o[: spec.n_cells].astype(np.int8)).astype(np.int8)
+
+
+def random_playouts(spec: BoardSpec, cells: np.ndarray, to_move: int, n: int, rng: np.random.Generator) -> np.ndarray:
+    """Plays ``n`` uniformly random games from ``cells`` to the end, returns each winner (1, -1 or 0).
+
+    Instead of playing move by move, every empty cell gets a random move number, which
+    fixes who owns it. A line is completed at the largest move number among its cells,
+    and the game goes to whoever completes a line first.
+    """
+    empty = np.flatnonzero(cells == 0)
+    lines = line_array(spec)
+    times = np.full((n, spec.n_cells), -1, dtype=np.int16)
+    times[:, empty] = rng.permuted(np.tile(np.arange(len(empty), dtype=np.int16), (n, 1)), axis=1)
+    owner = np.where(times < 0, cells, np.where(times % 2 == 0, to_move, -to_move)).astype(np.int8)
+
+    line_sum = owner[:, lines].sum(axis=2, dtype=np.int16)
+    line_time = times[:, lines].max(axis=2)
+    never = np.iinfo(np.int16).max
+    x_done = np.where(line_sum == spec.k, line_time, never).min(axis=1)
+    o_done = np.where(line_sum == -spec.k, line_time, never).min(axis=1)
+    return np.where(x_done < o_done, 1, np.where(o_done < x_done, -1, 0)).astype(np.int8)
+
+
+@lru_cache(maxsize=None)
+def cell_line_array(spec: BoardSpec) -> np.ndarray:
+    """(n_cells, max_lines, k) index array of the lines through each cell.
+
+    Cells on fewer lines are padded with lines made of the sentinel index ``n_cells``,
+    which callers point at an always empty extra column so padding never wins.
+    """
+    per_cell = spec.cell_masks
+    max_lines = max(len(masks) for masks in per_cell)
+    table = np.full((spec.n_cells, max_lines, spec.k), spec.n_cells, dtype=np.intp)
+    for idx in range(spec.n_cells):
+        through = [line for line in spec.lines if idx in line]
+        table[idx, : len(through)] = through
+    return table
@@ -0,0 +1,207 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+from utils.logging import Log
+from tic_tac_toe.ai import SearchStats
+from tic_tac_toe.board import BitBoard, BoardSpec, Player
+
+# A tablebase file is HEADER followed by one byte per base-3 position index, where
+# each cell contributes 3**idx times its code: 0 empty, 1 X, 2 O (the grid's 1/-1/0
+# values mod 3). The low 6 bits of an entry hold the best move, the top 2 the value
+# for the side to move, UNKNOWN for positions that can't come up in a game.
+HEADER = struct.Struct("<4sBBBB")
+MAGIC = b"TTTB"
+VERSION = 1
+
+UNKNOWN = 0
+LOSS = 1
+DRAW = 2
+WIN = 3
+
+VALUE_SHIFT = 6
+MOVE_MASK = (1 << VALUE_SHIFT) - 1
+NO_MOVE = MOVE_MASK
+
+# 3**16 bytes is 43MB, anything bigger than a 4x4 board doesn't make sense as a flat file
+MAX_CELLS = 16
+CHUNK_BITS = 8
+
+DEFAULT_DIR = Path(__file__).parent / "tablebases"
+
+
+def default_path(spec: BoardSpec) -> Path:
+    return DEFAULT_DIR / f"{spec.rows}x{spec.cols}k{spec.k}.ttb"
+
+
+class PositionIndex:
+    """Turns bitboards into base-3 position indices through per-chunk lookup tables."""
+
+    def __init__(self, spec: BoardSpec):
+        self.chunks: list[tuple[int, int, list[int]]] = []
+        for start in range(0, spec.n_cells, CHUNK_BITS):
+            length = min(CHUNK_BITS, spec.n_cells - start)
+            table = [sum(3 ** (start + i) for i in range(length) if value >> i & 1) for value in range(1 << length)]
+            self.chunks.append((start, (1 << length) - 1, table))
+        self.powers: np.ndarray = 3 ** np.arange(spec.n_cells, dtype=np.int64)
+
+    def __call__(self, x_bits: int, o_bits: int) -> int:
+        idx = 0
+        for start, mask, table in self.chunks:
+            idx += table[x_bits >> start & mask] + 2 * table[o_bits >> start & mask]
+        return idx
+
+    def from_grid(self, grid: np.ndarray) -> int:
+        return int(np.dot(np.ravel(grid) % 3, self.powers))
+
+
+def solve(spec: BoardSpec) -> bytearray:
+    """Solves every position reachable from the empty board, returns the tablebase payload."""
+    if spec.n_cells > MAX_CELLS:
+        raise ValueError(f"A {spec.rows}x{spec.cols} tablebase would need 3**{spec.n_cells} entries")
+
+    table = bytearray(3**spec.n_cells)
+    powers = [3**i for i in range(spec.n_cells)]
+    cell_masks = spec.cell_masks
+    full = spec.full
+    flip = (UNKNOWN, WIN, DRAW, LOSS)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), spec.n_cells * 4))
+
+    def search(me: int, opp: int, idx: int, code: int) -> int:
+        # ``code`` is the index digit of the side to move, 1 for X and 2 for O
+        entry = table[idx]
+        if entry:
+            return entry >> VALUE_SHIFT
+
+        occupied = me | opp
+        best, best_move, win_now = LOSS, NO_MOVE, NO_MOVE
+        if occupied == full:
+            best = DRAW
+        for cell in range(spec.n_cells):
+            bit = 1 << cell
+            if occupied & bit:
+                continue
+            new_me = me | bit
+            if any(new_me & mask == mask for mask in cell_masks[cell]):
+                # the game ends here, nothing to recurse into
+                if win_now == NO_MOVE:
+                    win_now = cell
+                value = WIN
+            else:
+                value = flip[search(opp, new_me, idx + code * powers[cell], 3 - code)]
+            if best_move == NO_MOVE or value > best:
+                best, best_move = value, cell
+
+        if win_now != NO_MOVE:
+            best_move = win_now
+        table[idx] = best << VALUE_SHIFT | best_move
+        return best
+
+    search(0, 0, 0, 1)
+    return table
+
+
+def build(spec: BoardSpec, path: Path):
+    start = time.perf_counter()
+    payload = solve(spec)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, spec.rows, spec.cols, spec.k))
+        f.write(payload)
+    # swap the file in atomically, other processes may have the old one mapped
+    os.replace(tmp, path)
+    solved = sum(1 for entry in payload if entry)
+    Log.info("Solved %d positions in %.1fs, wrote %s", solved, time.perf_counter() - start, path)
+
+
+class Tablebase:
+    """A solved game on disk, opened lazily and read through mmap.
+
+    The mapping is read-only, so the OS page cache backs it once for every process
+    that opens the same file; only the pages actually probed get read in.
+    """
+
+    def __init__(self, path: Path):
+        self.path: Path = Path(path)
+        self._mm: mmap.mmap | None = None
+        self._spec: BoardSpec | None = None
+        self._index: PositionIndex | None = None
+        self.last_stats: SearchStats = SearchStats()
+
+    def _open(self):
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows, cols, k = HEADER.unpack_from(mm)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} tablebase")
+        spec = BoardSpec(rows, cols, k)
+        if len(mm) != HEADER.size + 3**spec.n_cells:
+            mm.close()
+            raise ValueError(f"{self.path} is truncated")
+        self._mm, self._spec, self._index = mm, spec, PositionIndex(spec)
+
+    @property
+    def spec(self) -> BoardSpec:
+        if self._mm is None:
+            self._open()
+        return self._spec
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def probe_index(self, idx: int) -> tuple[int, int]:
+        """Value for the side to move and best move of the position with index ``idx``."""
+        if self._mm is None:
+            self._open()
+        entry = self._mm[HEADER.size + idx]
+        return entry >> VALUE_SHIFT, entry & MOVE_MASK
+
+    def probe(self, board: BitBoard) -> tuple[int, int]:
+        if self._mm is None:
+            self._open()
+        return self.probe_index(self._index(board.x_bits, board.o_bits))
+
+    def probe_grid(self, grid: np.ndarray) -> tuple[int, int]:
+        if self._mm is None:
+            self._open()
+        return self.probe_index(self._index.from_grid(grid))
+
+    def choose_move(self, board: BitBoard, player: Player) -> int:
+        start = time.perf_counter()
+        value, move = self.probe(board)
+        if value == UNKNOWN or move == NO_MOVE:
+            raise ValueError(f"Position isn't in {self.path}, {player.name} can't be the side to move")
+        self.last_stats = SearchStats(probes=1, hits=1, elapsed=time.perf_counter() - start)
+        return move
+
+
+@lru_cache(maxsize=None)
+def load_tablebase(spec: BoardSpec) -> Tablebase | None:
+    """The tablebase for ``spec`` if one has been generated; the file isn't touched until first probe."""
+    path = default_path(spec)
+    return Tablebase(path) if path.exists() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a tic-tac-toe tablebase")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("-k", type=int, default=3, help="stones in a row needed to win")
+    parser.add_argument("-o", "--output", type=Path, help=f"defaults to {DEFAULT_DIR}/<rows>x<cols>k<k>.ttb")
+    args = parser.parse_args()
+
+    spec = BoardSpec(args.rows, args.cols, args.k)
+    build(spec, args.output or default_path(spec))
+
+
+if __name__ == "__main__":
+    main()
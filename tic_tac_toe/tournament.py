@@ -0,0 +1,106 @@
+import argparse
+from functools import partial
+import numpy as np
+from utils import tournament
+from utils.logging import Log
+from tic_tac_toe.ai import MINIMAX_MAX_CELLS, MinimaxEngine
+from tic_tac_toe.board import BitBoard, BoardSpec, Player
+from tic_tac_toe.mcts import MctsEngine, set_bits, wins
+from tic_tac_toe.tablebase import load_tablebase
+
+ENTRANTS = ("random", "greedy", "minimax", "mcts", "tablebase")
+DEFAULT_PLAYERS = ("random", "greedy", "minimax", "mcts")
+
+
+class RandomEngine:
+    """Plays any empty cell, the baseline everything else should beat."""
+
+    def __init__(self, spec: BoardSpec, seed: int):
+        self.spec: BoardSpec = spec
+        self.rng = np.random.default_rng(seed)
+
+    def choose_move(self, board: BitBoard, player: Player) -> int:
+        empty = set_bits(self.spec.full & ~(board.x_bits | board.o_bits))
+        return empty[self.rng.integers(len(empty))]
+
+
+class GreedyEngine(RandomEngine):
+    """Wins when it can, blocks when it must, otherwise plays randomly."""
+
+    def choose_move(self, board: BitBoard, player: Player) -> int:
+        me, opp = (board.x_bits, board.o_bits) if player == Player.X else (board.o_bits, board.x_bits)
+        empty = set_bits(self.spec.full & ~(me | opp))
+        for bits in (me, opp):
+            for idx in empty:
+                if wins(self.spec, bits | 1 << idx, idx):
+                    return idx
+        return empty[self.rng.integers(len(empty))]
+
+
+def make_engine(name: str, spec: BoardSpec, seed: int, mcts_budget: float):
+    if name == "random":
+        return RandomEngine(spec, seed)
+    if name == "greedy":
+        return GreedyEngine(spec, seed)
+    if name == "minimax":
+        return MinimaxEngine(spec)
+    if name == "mcts":
+        # the tournament already keeps every core busy, one search process per game
+        return MctsEngine(spec, time_budget=mcts_budget, workers=1, seed=seed)
+    if name == "tablebase":
+        engine = load_tablebase(spec)
+        if engine is None:
+            raise ValueError(f"No tablebase for {spec}, generate one with python -m tic_tac_toe.tablebase")
+        return engine
+    raise ValueError(f"Unknown entrant {name}")
+
+
+def play_batch(first: str, second: str, seeds: list[int], spec: BoardSpec, mcts_budget: float) -> list[float]:
+    """One game per seed with ``first`` playing X, scored for ``first``."""
+    scores = []
+    for seed in seeds:
+        seed_x, seed_o = np.random.SeedSequence(seed).generate_state(2)
+        engines = {
+            Player.X: make_engine(first, spec, seed_x, mcts_budget),
+            Player.O: make_engine(second, spec, seed_o, mcts_budget),
+        }
+        board = BitBoard(spec)
+        player = Player.X
+        while not board.play(engines[player].choose_move(board, player), player) and not board.is_full():
+            player = Player(-player.value)
+        scores.append(1.0 if board.winner == Player.X else 0.0 if board.winner == Player.O else 0.5)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round robin between tic-tac-toe engines")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("-k", type=int, default=3, help="stones in a row needed to win")
+    parser.add_argument("--players", nargs="+", choices=ENTRANTS, help=f"defaults to {' '.join(DEFAULT_PLAYERS)}")
+    parser.add_argument("--rounds", type=int, default=1000, help="games per ordered pair")
+    parser.add_argument("--batch", type=int, default=100, help="games played in one worker task")
+    parser.add_argument(
+        "--mcts-budget",
+        type=float,
+        default=5,
+        help="milliseconds per MCTS move, time based so its games vary between runs",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="defaults to all cores")
+    args = parser.parse_args()
+
+    spec = BoardSpec(args.rows, args.cols, args.k)
+    players = args.players or list(DEFAULT_PLAYERS)
+    if "minimax" in players and spec.n_cells > MINIMAX_MAX_CELLS:
+        # its search wouldn't finish a single game on a board this big
+        if args.players:
+            parser.error(f"minimax only plays boards of up to {MINIMAX_MAX_CELLS} cells, not {spec.n_cells}")
+        Log.info("Leaving minimax out, it only plays boards of up to %d cells", MINIMAX_MAX_CELLS)
+        players.remove("minimax")
+    play = partial(play_batch, spec=spec, mcts_budget=args.mcts_budget / 1000)
+    tournament.run(players, play, args.rounds, args.batch, args.seed, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import math
+from typing import Callable, Optional
+import pygame
+
+# maps the fraction of a tween's duration that has passed to the fraction of the way it has moved
+Easing = Callable[[float], float]
+
+
+def linear(t: float) -> float:
+    return t
+
+
+def ease_in_quad(t: float) -> float:
+    return t * t
+
+
+def ease_out_quad(t: float) -> float:
+    return 1 - (1 - t) * (1 - t)
+
+
+def ease_in_out_cubic(t: float) -> float:
+    return 4 * t * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 3 / 2
+
+
+def ease_out_back(t: float) -> float:
+    """Overshoots a little before settling, for things that pop in."""
+    c = 1.70158
+    return 1 + (c + 1) * (t - 1) ** 3 + c * (t - 1) ** 2
+
+
+# scaled copies are made for at most this many steps per unit of scale, then reused
+SCALE_STEPS = 32
+
+
+class Tween:
+    """A pre-rendered surface whose alpha, center and scale move between two values over ``duration``.
+
+    The surface is copied once so its alpha can be set on it (``set_alpha`` leaves the
+    pixels alone, unlike a ``BLEND_RGBA_MULT`` pass). Scales are rounded to
+    ``1 / SCALE_STEPS`` and each step is only resized the first time it's reached, so a
+    running tween doesn't allocate.
+    """
+
+    __slots__ = (
+        "surface",
+        "start",
+        "duration",
+        "alpha",
+        "center",
+        "scale",
+        "easing",
+        "restore",
+        "_scaled",
+        "_shown",
+        "_underlay",
+        "_bounds",
+    )
+
+    def __init__(
+        self,
+        surface: pygame.Surface,
+        start: float,
+        duration: float,
+        center: tuple[tuple[float, float], tuple[float, float]],
+        alpha: tuple[int, int] = (255, 255),
+        scale: tuple[float, float] = (1.0, 1.0),
+        easing: Easing = linear,
+        restore: bool = False,
+    ):
+        self.surface: pygame.Surface = surface.copy()
+        self.start: float = start
+        self.duration: float = duration
+        self.center = center
+        self.alpha: tuple[int, int] = alpha
+        self.scale: tuple[float, float] = scale
+        self.easing: Easing = easing
+        # put back what was under the tween before each draw, for screens that are never repainted
+        self.restore: bool = restore
+        self._scaled: dict[int, pygame.Surface] = {SCALE_STEPS: self.surface}
+        # the scaled surface and alpha of the last draw, alpha only gets set when they change
+        self._shown: Optional[tuple[pygame.Surface, int]] = None
+        self._underlay: Optional[pygame.Surface] = None
+        self._bounds: Optional[pygame.Rect] = None
+
+    def done(self, now: float) -> bool:
+        return now - self.start >= self.duration
+
+    def _surface_at(self, scale: float) -> pygame.Surface:
+        step = max(1, round(scale * SCALE_STEPS))
+        surface = self._scaled.get(step)
+        if surface is None:
+            w, h = self.surface.get_size()
+            size = (max(1, round(w * step / SCALE_STEPS)), max(1, round(h * step / SCALE_STEPS)))
+            surface = self._scaled[step] = pygame.transform.smoothscale(self.surface, size)
+        return surface
+
+    def _area(self, screen: pygame.Surface) -> pygame.Rect:
+        """Everything the tween can cover from start to end, easings that overshoot included."""
+        w, h = self.surface.get_size()
+        biggest = max(abs(s) for s in self.scale) * 1.2
+        (x0, y0), (x1, y1) = self.center
+        rect = pygame.Rect(0, 0, math.ceil(w * biggest) + abs(x1 - x0), math.ceil(h * biggest) + abs(y1 - y0))
+        rect.center = ((x0 + x1) / 2, (y0 + y1) / 2)
+        return rect.clip(screen.get_rect())
+
+    def erase(self, screen: pygame.Surface) -> Optional[pygame.Rect]:
+        if self._underlay is None:
+            return None
+        return screen.blit(self._underlay, self._bounds)
+
+    def draw(self, screen: pygame.Surface, now: float) -> pygame.Rect:
+        if self.restore and self._underlay is None:
+            self._bounds = self._area(screen)
+            self._underlay = screen.subsurface(self._bounds).copy()
+
+        t = min(max((now - self.start) / self.duration, 0.0), 1.0) if self.duration > 0 else 1.0
+        k = self.easing(t)
+        surface = self._surface_at(self.scale[0] + (self.scale[1] - self.scale[0]) * k)
+        alpha = min(max(round(self.alpha[0] + (self.alpha[1] - self.alpha[0]) * k), 0), 255)
+        if self._shown is None or self._shown[0] is not surface or self._shown[1] != alpha:
+            surface.set_alpha(alpha)
+            self._shown = (surface, alpha)
+        (x0, y0), (x1, y1) = self.center
+        w, h = surface.get_size()
+        return screen.blit(surface, (x0 + (x1 - x0) * k - w / 2, y0 + (y1 - y0) * k - h / 2))
+
+
+class Animator:
+    """Runs any number of tweens off one clock, read once per frame.
+
+    ``draw`` draws every tween at the current time and retires the ones that are done
+    after drawing their last frame, so a fade in stays on screen and a fade out ends
+    invisible. ``active`` tells the main loop whether it has to keep producing frames.
+    """
+
+    def __init__(self, clock: Callable[[], float] = lambda: pygame.time.get_ticks() / 1000):
+        self.clock: Callable[[], float] = clock
+        self.tweens: list[Tween] = []
+
+    @property
+    def active(self) -> bool:
+        return bool(self.tweens)
+
+    def now(self) -> float:
+        return self.clock()
+
+    def add(
+        self,
+        surface: pygame.Surface,
+        duration: float,
+        center: tuple[float, float],
+        to_center: Optional[tuple[float, float]] = None,
+        alpha: tuple[int, int] = (255, 255),
+        scale: tuple[float, float] = (1.0, 1.0),
+        easing: Easing = linear,
+        delay: float = 0.0,
+        restore: bool = False,
+    ) -> Tween:
+        """Starts animating ``surface`` ``delay`` seconds from now, from ``center`` to ``to_center``."""
+        tween = Tween(
+            surface, self.now() + delay, duration, (center, to_center or center), alpha, scale, easing, restore
+        )
+        self.tweens.append(tween)
+        return tween
+
+    def remove(self, tween: Tween):
+        if tween in self.tweens:
+            self.tweens.remove(tween)
+
+    def clear(self):
+        self.tweens.clear()
+
+    def erase(self, screen: pygame.Surface) -> list[pygame.Rect]:
+        """Restores what the ``restore`` tweens covered, before anything else draws this frame."""
+        return [rect for tween in self.tweens if (rect := tween.erase(screen)) is not None]
+
+    def draw(self, screen: pygame.Surface) -> list[pygame.Rect]:
+        if not self.tweens:
+            return []
+        now = self.now()
+        rects = [tween.draw(screen, now) for tween in self.tweens if now >= tween.start]
+        if any(tween.done(now) for tween in self.tweens):
+            self.tweens = [tween for tween in self.tweens if not tween.done(now)]
+        return rects
@@ -1,60 +1,128 @@
 import pygame
-from dataclasses import dataclass
+from collections import OrderedDict
 from typing import Optional
 
+Color = str | tuple[int, int, int] | tuple[int, int, int, int]
 
-@dataclass
-class FadingText:
-    text: str
-    color: str | tuple[int, int, int]
-    font: pygame.font.Font
-    fade_start: float
-    fade_duration: float = 1.0
 
-    def should_render(self, current_time: float) -> bool:
-        return current_time - self.fade_start < self.fade_duration
+class TextCache:
+    """Shared fonts and rendered text surfaces, so unchanged text is never rendered twice.
 
-    def render(self, screen: pygame.Surface, center_pos: tuple[int, int], current_time: float):
-        if not self.should_render(current_time):
+    Fonts are kept per (face, size) for the life of the cache. Surfaces are keyed on
+    (text, font, color, antialias) and the least recently used ones are evicted once
+    there are more than ``max_surfaces``. Callers must not draw onto returned surfaces.
+    """
+
+    def __init__(self, max_surfaces: int = 256):
+        self.max_surfaces: int = max_surfaces
+        self._fonts: dict[tuple[Optional[str], int], pygame.font.Font] = {}
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def font(self, size: int, face: Optional[str] = None) -> pygame.font.Font:
+        """The font for ``face`` (a font file, the default font if None) at ``size``."""
+        key = (face, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = pygame.font.Font(face or pygame.font.get_default_font(), size)
+        return font
+
+    def render(self, text: str, font: pygame.font.Font, color: Color, antialias: bool = True) -> pygame.Surface:
+        key = (text, font, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self._surfaces[key] = font.render(text, antialias, color)
+        if len(self._surfaces) > self.max_surfaces:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def invalidate(self, text: Optional[str] = None, font: Optional[pygame.font.Font] = None):
+        """Drops the surfaces matching ``text`` and/or ``font``, or everything if neither is given."""
+        if text is None and font is None:
+            self._surfaces.clear()
             return
+        for key in [
+            key for key in self._surfaces if (text is None or key[0] == text) and (font is None or key[1] is font)
+        ]:
+            del self._surfaces[key]
+
+    def clear(self):
+        """Forgets fonts as well as surfaces, needed after pygame.quit() invalidates them."""
+        self._surfaces.clear()
+        self._fonts.clear()
+
+
+text_cache = TextCache()
+
+
+class DirtyRects:
+    """Tracks which parts of the screen changed so a frame only pushes those to the display.
+
+    Everything drawn in a frame is registered with ``add``. The next ``clear`` paints the
+    background over just those areas, and ``present`` updates the erased and newly drawn
+    areas with ``pygame.display.update``. A full frame (the first one, after ``invalidate``,
+    or while ``clear(full=True)`` is requested, e.g. for a full screen overlay) falls back
+    to filling the whole screen and ``flip``.
+    """
+
+    def __init__(self, screen: pygame.Surface, background: Color = "gray"):
+        self.screen: pygame.Surface = screen
+        self.background: Color = background
+        self._drawn: list[pygame.Rect] = []
+        self._previous: list[pygame.Rect] = []
+        self._erased: list[pygame.Rect] = []
+        self._full: bool = True
+        self._full_requested: bool = False
+
+    def invalidate(self):
+        """Makes the next frame a full redraw."""
+        self._full = True
+
+    def clear(self, full: bool = False):
+        """Erases last frame's drawing, or the whole screen if ``full`` is set now or was last frame."""
+        # whatever a full screen overlay covered has to be repainted the frame after it goes away
+        if full or self._full_requested:
+            self._full = True
+        self._full_requested = full
 
-        elapsed = current_time - self.fade_start
-        # Calculate alpha based on time elapsed (fade from 255 to 0)
-        alpha = int(255 * (1 - elapsed / self.fade_duration))
+        if self._full:
+            self.screen.fill(self.background)
+        else:
+            for rect in self._previous:
+                self.screen.fill(self.background, rect)
+            self._erased = self._previous
 
-        # Create text surface
-        text_surface = self.font.render(self.text, True, self.color)
+    def add(self, rect: Optional[pygame.Rect]) -> Optional[pygame.Rect]:
+        if rect is not None:
+            self._drawn.append(pygame.Rect(rect))
+        return rect
 
-        # Create a surface with alpha channel
-        alpha_surface = pygame.Surface(text_surface.get_size(), pygame.SRCALPHA)
-        alpha_surface.fill((0, 0, 0, alpha))
-        text_surface.blit(alpha_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    def rects(self, rects: list[pygame.Rect]):
+        for rect in rects:
+            self.add(rect)
 
-        # Center and render the text
-        text_rect = text_surface.get_rect(center=center_pos)
-        screen.blit(text_surface, text_rect)
+    def present(self):
+        if self._full:
+            pygame.display.flip()
+        elif self._erased or self._drawn:
+            pygame.display.update(self._erased + self._drawn)
+        self._full = False
+        self._previous, self._drawn, self._erased = self._drawn, [], []
 
 
-def render_centered_text_lines(
-    screen: pygame.Surface, lines: list[str], font: pygame.font.Font, color: str | tuple[int, int, int]
-):
-    """Renders multiple lines of text centered on the screen."""
-    screen_width = screen.get_width()
-    screen_height = screen.get_height()
+def render_text_lines(lines: list[str], font: pygame.font.Font, color: str | tuple[int, int, int]) -> pygame.Surface:
+    """Renders multiple lines of text, each centered, onto one transparent surface."""
+    texts = [text_cache.render(line, font, color) for line in lines]
     line_height = font.get_linesize()
-    total_height = line_height * len(lines)
-    start_y = (screen_height - total_height) / 2
-
-    for i, line in enumerate(lines):
-        text = font.render(line, True, color)
-        text_rect = text.get_rect(center=(screen_width / 2, start_y + i * line_height))
-        screen.blit(text, text_rect)
-
-
-def create_fading_text(
-    text: str, color: str | tuple[int, int, int], font: pygame.font.Font, fade_duration: float = 1.0
-) -> FadingText:
-    """Creates a FadingText object with the current time as fade start."""
-    return FadingText(
-        text=text, color=color, font=font, fade_start=pygame.time.get_ticks() / 1000, fade_duration=fade_duration
-    )
+    width = max(text.get_width() for text in texts)
+    surface = pygame.Surface((width, line_height * len(lines)), pygame.SRCALPHA)
+    for i, text in enumerate(texts):
+        # copies the text's own alpha instead of blending it onto the transparent background
+        surface.blit(text, text.get_rect(midtop=(width / 2, i * line_height)), special_flags=pygame.BLEND_RGBA_MAX)
+    return surface
@@ -1,35 +1,133 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Optional
 
-# Configure logging with timestamp (no comma between seconds and milliseconds)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s.%(msecs)03d:%(levelname)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+# timestamp without a comma between seconds and milliseconds
+FORMAT = "%(asctime)s.%(msecs)03d:%(levelname)s: %(message)s"
+DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+_logger = logging.getLogger("games")
 
 
 class Log:
+    """Logging facade whose output is written from a background thread.
+
+    Records go through a ``QueueHandler`` onto an unbounded queue that a
+    ``QueueListener`` drains into the real handlers, so a slow terminal or log file
+    can't stall a frame. The level is checked against a plain int before anything
+    else, a disabled call costs one comparison. The backend starts on first use, or
+    explicitly with ``configure``; importing the module configures nothing.
+
+    ``event`` keeps structured records (name, frame number, fields) in an optional
+    ring buffer, enabled with ``record_events`` and written out with ``dump_events``.
+    """
+
+    level: int = logging.INFO
+    frame: int = 0
+    _listener: Optional[logging.handlers.QueueListener] = None
+    _events: Optional[deque] = None
+
+    @classmethod
+    def configure(cls, level: int = logging.INFO, handlers: Optional[list[logging.Handler]] = None):
+        """Starts the writer thread, logging to stderr unless other ``handlers`` are given."""
+        cls.shutdown()
+        if handlers is None:
+            handler = logging.StreamHandler(sys.stderr)
+            handler.setFormatter(logging.Formatter(FORMAT, DATEFMT))
+            handlers = [handler]
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+        _logger.propagate = False
+        cls.set_level(level)
+        cls._listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        cls._listener.start()
+
+    @classmethod
+    def set_level(cls, level: int):
+        cls.level = level
+        _logger.setLevel(level)
+
+    @classmethod
+    def shutdown(cls):
+        """Stops the writer thread once everything queued so far is written."""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+
+    @classmethod
+    def _log(cls, level: int, msg, args, kwargs):
+        if cls._listener is None:
+            cls.configure(cls.level)
+        _logger.log(level, msg, *args, **kwargs)
+
     @staticmethod
     def info(msg, *args, **kwargs):
-        logging.info(msg, *args, **kwargs)
+        if Log.level <= logging.INFO:
+            Log._log(logging.INFO, msg, args, kwargs)
 
     @staticmethod
     def warning(msg, *args, **kwargs):
-        logging.warning(msg, *args, **kwargs)
+        if Log.level <= logging.WARNING:
+            Log._log(logging.WARNING, msg, args, kwargs)
 
     @staticmethod
     def error(msg, *args, **kwargs):
-        logging.error(msg, *args, **kwargs)
+        if Log.level <= logging.ERROR:
+            Log._log(logging.ERROR, msg, args, kwargs)
 
     @staticmethod
     def debug(msg, *args, **kwargs):
-        logging.debug(msg, *args, **kwargs)
+        if Log.level <= logging.DEBUG:
+            Log._log(logging.DEBUG, msg, args, kwargs)
 
     @staticmethod
     def critical(msg, *args, **kwargs):
-        logging.critical(msg, *args, **kwargs)
+        if Log.level <= logging.CRITICAL:
+            Log._log(logging.CRITICAL, msg, args, kwargs)
 
     @staticmethod
     def exception(msg, *args, **kwargs):
         """Logs an error message along with the exception traceback."""
-        logging.exception(msg, *args, **kwargs)
+        if Log.level <= logging.ERROR:
+            Log._log(logging.ERROR, msg, args, {"exc_info": True, **kwargs})
+
+    @staticmethod
+    def next_frame():
+        """Called by game loops once per frame, stamps the following events."""
+        Log.frame += 1
+
+    @classmethod
+    def record_events(cls, capacity: int = 1024):
+        """Keeps the last ``capacity`` structured events in memory, 0 turns recording off."""
+        cls._events = deque(maxlen=capacity) if capacity else None
+
+    @staticmethod
+    def event(name: str, **fields: Any):
+        events = Log._events
+        if events is not None:
+            events.append((time.time(), Log.frame, name, fields))
+
+    @classmethod
+    def dump_events(cls, path: Optional[Path] = None) -> list[dict]:
+        """Returns the buffered events, written as JSON lines to ``path`` or else to the log."""
+        records = [
+            {"time": timestamp, "frame": frame, "event": name, **fields}
+            for timestamp, frame, name, fields in cls._events or ()
+        ]
+        if path is not None:
+            Path(path).write_text("".join(json.dumps(record) + "\n" for record in records))
+            cls.info("Wrote %d events to %s", len(records), path)
+        else:
+            for record in records:
+                cls.info("%s", json.dumps(record))
+        return records
+
+
+atexit.register(Log.shutdown)
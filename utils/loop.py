@@ -0,0 +1,81 @@
+import heapq
+import itertools
+import pygame
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+@dataclass(order=True)
+class Timer:
+    due: int
+    seq: int
+    callback: Callable[[], None] = field(compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    """Main loop helper that sleeps in ``pygame.event.wait`` whenever nothing is going on.
+
+    A loop calls ``wait`` once per iteration and ``run_timers`` after it. While ``busy``
+    (something is animating) ``wait`` returns the pending events right away, like
+    ``pygame.event.get``. Otherwise it blocks until an event arrives or the next
+    ``call_later`` timer is due, so an idle window costs no CPU. ``request_redraw``/
+    ``take_redraw`` let the loop skip drawing entirely when a wake up didn't change
+    anything.
+    """
+
+    def __init__(self, ignore: tuple[int, ...] = (pygame.MOUSEMOTION,)):
+        # events nobody handles would only wake the loop up for nothing
+        if ignore:
+            pygame.event.set_blocked(list(ignore))
+        self._timers: list[Timer] = []
+        self._seq = itertools.count()
+        self._redraw: bool = True
+        self.idled: bool = False  # whether the last wait blocked
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Timer:
+        """Runs ``callback`` from ``run_timers`` once ``delay`` seconds have passed."""
+        timer = Timer(pygame.time.get_ticks() + int(delay * 1000), next(self._seq), callback)
+        heapq.heappush(self._timers, timer)
+        return timer
+
+    @property
+    def pending(self) -> bool:
+        return any(not timer.cancelled for timer in self._timers)
+
+    def request_redraw(self):
+        self._redraw = True
+
+    def take_redraw(self) -> bool:
+        """True once after each ``request_redraw``."""
+        redraw, self._redraw = self._redraw, False
+        return redraw
+
+    def _due(self) -> bool:
+        return bool(self._timers) and self._timers[0].due <= pygame.time.get_ticks()
+
+    def run_timers(self):
+        now = pygame.time.get_ticks()
+        while self._timers and self._timers[0].due <= now:
+            timer = heapq.heappop(self._timers)
+            if not timer.cancelled:
+                timer.callback()
+                self._redraw = True
+
+    def wait(self, busy: bool = False) -> list[pygame.event.Event]:
+        """Returns this iteration's events, blocking first unless ``busy``, events are queued or a timer is due."""
+        while self._timers and self._timers[0].cancelled:
+            heapq.heappop(self._timers)
+
+        events = pygame.event.get()
+        self.idled = not busy and not events and not self._due()
+        if self.idled:
+            # 0 waits forever, otherwise wake up in time for the next timer
+            timeout = max(1, self._timers[0].due - pygame.time.get_ticks()) if self._timers else 0
+            event = pygame.event.wait(timeout)
+            if event.type != pygame.NOEVENT:
+                events = [event] + pygame.event.get()
+        return events
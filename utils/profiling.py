@@ -0,0 +1,203 @@
+import json
+import time
+import numpy as np
+import pygame
+from pathlib import Path
+from typing import Optional
+from utils.logging import Log
+
+
+class RingBuffer:
+    """Fixed-size float buffer that overwrites its oldest values, no allocation once created."""
+
+    def __init__(self, capacity: int):
+        self.data: np.ndarray = np.zeros(capacity, dtype=np.float64)
+        self.capacity: int = capacity
+        self.count: int = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, value: float):
+        self.data[self.count % self.capacity] = value
+        self.count += 1
+
+    def values(self) -> np.ndarray:
+        """The stored values, oldest first."""
+        if self.count <= self.capacity:
+            return self.data[: self.count]
+        split = self.count % self.capacity
+        return np.concatenate((self.data[split:], self.data[:split]))
+
+
+class _Phase:
+    """Context manager timing one phase, reused every frame to keep the hooks allocation free."""
+
+    __slots__ = ("profiler", "starts", "durations", "start")
+
+    def __init__(self, profiler: "FrameProfiler", capacity: int):
+        self.profiler = profiler
+        self.starts = RingBuffer(capacity)
+        self.durations = RingBuffer(capacity)
+        self.start: float = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self.start
+        self.starts.append(self.start)
+        self.durations.append(duration)
+        self.profiler._record(self, duration)
+
+
+class FrameProfiler:
+    """Times each phase of a frame into ring buffers, for a HUD and Chrome trace exports.
+
+    A loop calls ``begin_frame``, wraps its work in ``with profiler.phase(name):`` blocks
+    and calls ``end_frame``. Time spent in the ``IDLE`` phase (sleeping in
+    ``clock.tick`` or waiting for events) counts towards FPS but not frame time.
+    """
+
+    IDLE = "idle"
+    HUD_REFRESH = 0.25  # seconds between HUD text updates, re-rendering every frame would show up in the profile
+
+    def __init__(self, capacity: int = 600):
+        self.capacity: int = capacity
+        self.origin: float = time.perf_counter()
+        self.frame_starts = RingBuffer(capacity)
+        self.frame_ends = RingBuffer(capacity)
+        self.frame_times = RingBuffer(capacity)
+        self.phases: dict[str, _Phase] = {}
+        self._frame_start: float = 0.0
+        self._frame_idle: float = 0.0
+        self._in_frame: bool = False
+
+        self.hud_visible: bool = False
+        self._hud_surface: Optional[pygame.Surface] = None
+        self._hud_updated: float = 0.0
+        self._hud_rect: Optional[pygame.Rect] = None
+        self._hud_underlay: Optional[pygame.Surface] = None
+
+    def phase(self, name: str) -> _Phase:
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = _Phase(self, self.capacity)
+        return phase
+
+    def _record(self, phase: _Phase, duration: float):
+        if phase is self.phases.get(self.IDLE):
+            self._frame_idle += duration
+
+    def begin_frame(self):
+        self._frame_start = time.perf_counter()
+        self._frame_idle = 0.0
+        self._in_frame = True
+
+    def end_frame(self):
+        if not self._in_frame:
+            return
+        end = time.perf_counter()
+        self.frame_starts.append(self._frame_start)
+        self.frame_ends.append(end)
+        self.frame_times.append(end - self._frame_start - self._frame_idle)
+        self._in_frame = False
+
+    def discard_frame(self):
+        """Drops the current frame, e.g. when the loop decided there was nothing to draw."""
+        self._in_frame = False
+
+    def fps(self) -> float:
+        starts = self.frame_starts.values()
+        if len(starts) < 2:
+            return 0.0
+        return float((len(starts) - 1) / (starts[-1] - starts[0]))
+
+    def summary(self) -> dict[str, float]:
+        """FPS, p50/p99 frame time and mean cost of every phase, times in milliseconds."""
+        frame_times = self.frame_times.values()
+        stats = {"fps": self.fps()}
+        if len(frame_times):
+            p50, p99 = np.percentile(frame_times, [50, 99])
+            stats["frame_p50_ms"] = float(p50 * 1000)
+            stats["frame_p99_ms"] = float(p99 * 1000)
+        for name, phase in self.phases.items():
+            if len(phase.durations):
+                stats[f"{name}_ms"] = float(phase.durations.values().mean() * 1000)
+        return stats
+
+    def export_chrome_trace(self, path: Path) -> Path:
+        """Writes the buffered frames and phases in Chrome's trace event format (chrome://tracing, Perfetto)."""
+
+        def event(name: str, start: float, duration: float) -> dict:
+            return {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": 0,
+                "tid": 0,
+            }
+
+        starts = self.frame_starts.values()
+        events = [event("frame", start, end - start) for start, end in zip(starts, self.frame_ends.values())]
+        for name, phase in self.phases.items():
+            events += [event(name, start, dur) for start, dur in zip(phase.starts.values(), phase.durations.values())]
+        events.sort(key=lambda e: e["ts"])
+
+        path = Path(path)
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+        Log.info("Wrote %d trace events to %s", len(events), path)
+        return path
+
+    def export_default(self) -> Path:
+        return self.export_chrome_trace(Path(time.strftime("trace-%Y%m%d-%H%M%S.json")))
+
+    def toggle_hud(self):
+        self.hud_visible = not self.hud_visible
+        self._hud_surface = None
+
+    def _render_hud(self, font: pygame.font.Font) -> pygame.Surface:
+        stats = self.summary()
+        lines = [
+            f"FPS {stats['fps']:.1f}",
+            f"frame p50 {stats.get('frame_p50_ms', 0):.2f} ms  p99 {stats.get('frame_p99_ms', 0):.2f} ms",
+        ]
+        lines += [
+            f"{name} {stats[f'{name}_ms']:.3f} ms"
+            for name in self.phases
+            if name != self.IDLE and f"{name}_ms" in stats
+        ]
+        texts = [font.render(line, True, "white") for line in lines]
+        padding = 4
+        width = max(text.get_width() for text in texts) + 2 * padding
+        height = sum(text.get_height() for text in texts) + 2 * padding
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 170))
+        y = padding
+        for text in texts:
+            surface.blit(text, (padding, y))
+            y += text.get_height()
+        return surface
+
+    def draw_hud(self, screen: pygame.Surface, font: pygame.font.Font, topleft: tuple[int, int] = (0, 0)):
+        """Draws the HUD if visible and returns its rect; the covered pixels are kept for ``erase_hud``."""
+        if not self.hud_visible:
+            return None
+        now = time.perf_counter()
+        if self._hud_surface is None or now - self._hud_updated >= self.HUD_REFRESH:
+            self._hud_surface = self._render_hud(font)
+            self._hud_updated = now
+        rect = self._hud_surface.get_rect(topleft=topleft).clip(screen.get_rect())
+        self._hud_underlay = screen.subsurface(rect).copy()
+        self._hud_rect = screen.blit(self._hud_surface, rect)
+        return self._hud_rect
+
+    def erase_hud(self, screen: pygame.Surface) -> Optional[pygame.Rect]:
+        """Puts back what the last ``draw_hud`` covered, for screens that aren't repainted every frame."""
+        if self._hud_underlay is None:
+            return None
+        rect = screen.blit(self._hud_underlay, self._hud_rect)
+        self._hud_underlay = None
+        return rect
@@ -0,0 +1,125 @@
+import math
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Hashable, Optional
+import pygame
+
+
+class Blend(Enum):
+    # fully covers its box, blits as a straight copy
+    OPAQUE = 1
+    # antialiased or partly transparent, per pixel alpha
+    ALPHA = 2
+    # hard edged shapes drawn many times a frame, colorkeyed and RLE encoded which blits fastest
+    COLORKEY = 3
+
+
+# painted around colorkey shapes, nothing may use it as a real color
+COLORKEY = (255, 0, 255)
+
+
+@dataclass(frozen=True)
+class Shape:
+    size: tuple[int, int]
+    # draws the shape onto a surface of ``size``, transparent or filled with COLORKEY first
+    paint: Callable[[pygame.Surface], None]
+    blend: Blend = Blend.ALPHA
+
+
+# the shapes to pre-render for a given window size
+Define = Callable[[tuple[int, int]], dict[Hashable, Shape]]
+
+
+class SpriteAtlas:
+    """Shapes rendered once into display format sheets, so drawing them is a plain blit.
+
+    ``define`` lists the shapes for a window size. On first use, and again whenever the
+    window size changes or ``invalidate`` is called (e.g. when the game's scale
+    changes), every shape is painted and shelf packed onto one sheet per ``Blend``,
+    converted with ``convert``/``convert_alpha`` to match the display. Blits copy from
+    the sheet with an area, nothing is rasterized per frame.
+    """
+
+    def __init__(self, define: Define):
+        self.define: Define = define
+        self._window_size: Optional[tuple[int, int]] = None
+        self._sheets: dict[Blend, pygame.Surface] = {}
+        self._sprites: dict[Hashable, tuple[pygame.Surface, pygame.Rect]] = {}
+        self.builds: int = 0
+
+    def invalidate(self):
+        """Rebuilds the sheets on next use."""
+        self._window_size = None
+
+    def _ensure_built(self):
+        window_size = pygame.display.get_window_size()
+        if window_size != self._window_size:
+            self._build(window_size)
+
+    def _build(self, window_size: tuple[int, int]):
+        shapes = self.define(window_size)
+        self._sheets.clear()
+        self._sprites.clear()
+        for blend in Blend:
+            group = {key: shape for key, shape in shapes.items() if shape.blend == blend}
+            if group:
+                self._pack(blend, group)
+        self._window_size = window_size
+        self.builds += 1
+
+    def _pack(self, blend: Blend, shapes: dict[Hashable, Shape]):
+        # shelves of shapes sorted tallest first, about as wide as the sheet is tall
+        area = sum(w * h for w, h in (shape.size for shape in shapes.values()))
+        sheet_width = max(max(shape.size[0] for shape in shapes.values()), math.isqrt(area))
+        order = sorted(shapes, key=lambda key: shapes[key].size[1], reverse=True)
+        rects: dict[Hashable, pygame.Rect] = {}
+        x = y = shelf_height = 0
+        for key in order:
+            w, h = shapes[key].size
+            if x + w > sheet_width:
+                x, y, shelf_height = 0, y + shelf_height, 0
+            rects[key] = pygame.Rect(x, y, w, h)
+            x += w
+            shelf_height = max(shelf_height, h)
+
+        size = (sheet_width, y + shelf_height)
+        if blend == Blend.ALPHA:
+            sheet = pygame.Surface(size, pygame.SRCALPHA)
+            sheet.fill((0, 0, 0, 0))
+        else:
+            sheet = pygame.Surface(size)
+            sheet.fill(COLORKEY)
+        for key, rect in rects.items():
+            # a subsurface keeps painters in their own coordinates and clipped to their box
+            shapes[key].paint(sheet.subsurface(rect))
+
+        if blend == Blend.ALPHA:
+            sheet = sheet.convert_alpha()
+        else:
+            sheet = sheet.convert()
+            if blend == Blend.COLORKEY:
+                sheet.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        self._sheets[blend] = sheet
+        for key, rect in rects.items():
+            self._sprites[key] = (sheet, rect)
+
+    def size(self, key: Hashable) -> tuple[int, int]:
+        self._ensure_built()
+        return self._sprites[key][1].size
+
+    def blit(self, screen: pygame.Surface, key: Hashable, topleft: tuple[float, float]) -> pygame.Rect:
+        """Draws the sprite ``key`` at ``topleft``, returns the area drawn."""
+        self._ensure_built()
+        sheet, area = self._sprites[key]
+        return screen.blit(sheet, topleft, area)
+
+    def blit_centered(self, screen: pygame.Surface, key: Hashable, center: tuple[float, float]) -> pygame.Rect:
+        self._ensure_built()
+        sheet, area = self._sprites[key]
+        return screen.blit(sheet, (center[0] - area.width / 2, center[1] - area.height / 2), area)
+
+    def blits(self, screen: pygame.Surface, key: Hashable, topleft: list[tuple[int, int]]):
+        """Draws the sprite ``key`` at every position in one call, for when there are thousands."""
+        self._ensure_built()
+        sheet, area = self._sprites[key]
+        screen.blits([(sheet, p, area) for p in topleft], doreturn=False)
@@ -0,0 +1,150 @@
+import importlib.abc
+import sys
+import time
+from typing import Optional
+from utils.logging import Log
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps a module's loader for the duration of its ``exec_module``."""
+
+    def __init__(self, loader: importlib.abc.Loader, timer: "ImportTimer"):
+        self.loader = loader
+        self.timer = timer
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        # the module keeps its real loader, importlib.resources and friends look at it later
+        module.__loader__ = self.loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self.loader
+        self.timer.enter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.timer.leave(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """Times every module executed while installed, like ``python -X importtime`` but in process.
+
+    Sits first on ``sys.meta_path``, lets the other finders find the spec and wraps its
+    loader, so each module's ``exec_module`` is timed. Time spent importing other
+    modules from within one counts towards its cumulative time only.
+    """
+
+    def __init__(self):
+        # name -> (self, cumulative) seconds, in the order the imports finished
+        self.times: dict[str, tuple[float, float]] = {}
+        self._stack: list[list[float]] = []
+        # time spent in imports that weren't nested in another one
+        self.total: float = 0.0
+
+    def install(self) -> "ImportTimer":
+        sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def enter(self):
+        # start time and time spent in nested imports
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def leave(self, name: str):
+        start, nested = self._stack.pop()
+        cumulative = time.perf_counter() - start
+        self.times[name] = (cumulative - nested, cumulative)
+        if self._stack:
+            self._stack[-1][1] += cumulative
+        else:
+            self.total += cumulative
+
+    def report(self, top: int = 15) -> str:
+        slowest = sorted(self.times.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        lines = [
+            f"{len(self.times)} modules imported in {self.total * 1000:.0f} ms, slowest by cumulative time (ms):",
+            "    self  cumulative",
+        ]
+        for name, (own, cumulative) in slowest:
+            lines.append(f"{own * 1000:8.1f}  {cumulative * 1000:10.1f}  {name}")
+        return "\n".join(lines)
+
+
+class Startup:
+    """Milestones from the launcher starting to the first frame on screen.
+
+    The launcher calls ``watch_first_frame`` once pygame is imported, the games
+    themselves know nothing about it.
+    """
+
+    start: float = time.perf_counter()
+    marks: list[tuple[str, float]] = []
+    imports: Optional[ImportTimer] = None
+
+    @classmethod
+    def mark(cls, label: str):
+        cls.marks.append((label, time.perf_counter() - cls.start))
+
+    @classmethod
+    def watch_first_frame(cls):
+        """Reports the milestones after the first ``pygame.display.flip`` or ``update``.
+
+        Both are swapped for wrappers that put the originals back on their first call,
+        so no frame after that one pays for the check.
+        """
+        import pygame
+
+        flip, update = pygame.display.flip, pygame.display.update
+
+        def presented():
+            pygame.display.flip, pygame.display.update = flip, update
+            cls.first_frame()
+
+        def first_flip():
+            flip()
+            presented()
+
+        def first_update(*args):
+            update(*args)
+            presented()
+
+        pygame.display.flip, pygame.display.update = first_flip, first_update
+
+    @classmethod
+    def first_frame(cls):
+        cls.mark("first frame")
+        Log.info("Startup: %s", ", ".join(f"{label} {seconds * 1000:.0f} ms" for label, seconds in cls.marks))
+        if cls.imports is not None:
+            cls.imports.uninstall()
+            Log.info("%s", cls.imports.report())
+
+    @staticmethod
+    def preload_fonts(sizes: tuple[int, ...]):
+        """Loads the fonts into the shared ``text_cache`` before the game module imports.
+
+        Loading them takes about a millisecond, so it isn't worth a thread racing the
+        game's own pygame calls for it.
+        """
+        # utils.display imports pygame, which the launcher wants to import itself first
+        from utils.display import text_cache
+
+        for size in sizes:
+            text_cache.font(size)